@@ -1,7 +1,18 @@
 import asyncio
-from src.run import main
+import os
+import sys
+
+if len(sys.argv) > 1:
+    os.environ["ROLE"] = sys.argv[1]
+
+from src.config import UVICORN_WORKERS  # noqa: E402
+from src.run import Role, get_role, main, run_workers  # noqa: E402
 
 if __name__ == "__main__":
+    role = get_role()
+    if UVICORN_WORKERS > 1 and role != Role.SCHEDULER:
+        run_workers(role)
+        raise SystemExit
     try:
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
@@ -1,11 +1,12 @@
 from fastapi import APIRouter
-from . import guards, telegram
+from . import guards, metrics, telegram
 
 
 def setup_api_routers() -> APIRouter:
     router = APIRouter()
     router.include_router(guards.router)
     router.include_router(telegram.router)
+    router.include_router(metrics.router)
     return router
 
 
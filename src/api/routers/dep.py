@@ -1,7 +1,8 @@
-from typing import Annotated
+from hashlib import sha256
+from typing import Annotated, Optional
 from fastapi import Depends, HTTPException
 
-from src.db import GetDB, AsyncSession, Subscription, Server, Setting
+from src.db import GetDB, AsyncSession, Subscription, Server, Setting, LoadProfile
 
 
 async def _get_db():
@@ -24,12 +25,15 @@ async def get_settings(db: AsyncSession = Depends(_get_db)):
 
 
 async def _get_guard(key: str, db: AsyncSession = Depends(_get_db)) -> Subscription:
-    sub = await Subscription.get_by_access_key(db, key)
+    sub = await Subscription.get_by_access_key(db, key, LoadProfile.GUARD)
     if not sub:
         raise HTTPException(status_code=404, detail="Subscription not found")
     return sub
 
 
+PROFILE_UPDATE_INTERVAL = 1
+
+
 def get_headers(sub: Subscription) -> dict:
     subscription_userinfo = {
         "upload": 0,
@@ -42,12 +46,28 @@ def get_headers(sub: Subscription) -> dict:
         "profile-web-page-url": sub.link,
         "support-url": "",
         "profile-title": "Guard Sub",
-        "profile-update-interval": "1",
+        "profile-update-interval": str(PROFILE_UPDATE_INTERVAL),
         "subscription-userinfo": "; ".join(f"{key}={val}" for key, val in subscription_userinfo.items()),
+        "cache-control": f"private, max-age={PROFILE_UPDATE_INTERVAL * 3600}, must-revalidate",
     }
     return response_headers
 
 
+def get_etag(content: str, headers: dict) -> str:
+    digest = sha256()
+    digest.update(content.encode())
+    for name in ("subscription-userinfo", "profile-web-page-url"):
+        digest.update(b"\0" + headers.get(name, "").encode())
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
 GetSession = Annotated[AsyncSession, Depends(_get_db)]
 GetGuard = Annotated[Subscription, Depends(_get_guard)]
 GetSetting = Annotated[Setting, Depends(get_settings)]
@@ -1,9 +1,9 @@
-from datetime import datetime
 from fastapi import APIRouter, Response, HTTPException, Request
 
-from src.db import Subscription
+from src.db import Subscription, SubscriptionTouches
 from src.xui import XUIManager
-from .dep import get_headers, GetGuard, GetSession, GetServers, GetSetting
+from src.utils.cache import GuardCache
+from .dep import get_headers, get_etag, etag_matches, get_settings, GetSession
 
 router = APIRouter(
     prefix="/guards",
@@ -11,18 +11,42 @@ router = APIRouter(
 )
 
 
+def _respond(request: Request, content: str, headers: dict, etag: str) -> Response:
+    headers = {**headers, "etag": etag}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(
+            status_code=304,
+            headers={"etag": etag, "cache-control": headers["cache-control"]},
+        )
+    return Response(
+        content=content,
+        media_type="text/plain",
+        headers=headers,
+    )
+
+
 @router.get("/{key}")
-async def get_subscription(key: str, db: GetSession, request: Request, sub: GetGuard, servers: GetServers, setting: GetSetting):
+async def get_subscription(key: str, db: GetSession, request: Request):
     """Handle incoming subscription request from clients."""
-    dbsub = await Subscription.get_by_access_key(db, key)
-    if not dbsub:
-        raise HTTPException(status_code=404)
-    dbsub.last_sub_updated_at = datetime.now()
+    cached = GuardCache.get(key)
+    if cached:
+        sub_id, content, headers, etag = cached
+        SubscriptionTouches.touch(sub_id)
+        return _respond(request, content, headers, etag)
+
+    guard = await Subscription.get_for_guard(db, key)
+    if not guard:
+        raise HTTPException(status_code=404, detail="Subscription not found")
+    dbsub, servers = guard
+    if not servers:
+        raise HTTPException(status_code=404, detail="Hosting not found")
+    setting = await get_settings(db)
+    SubscriptionTouches.touch(dbsub.id)
     if not dbsub.is_activate_expire:
         dbsub = await dbsub.activate_expire(db, dbsub)
     links = await XUIManager.get_links(servers=servers, sub=dbsub, setting=setting)
-    return Response(
-        content="\n".join(links) if links else "",
-        media_type="text/plain",
-        headers=get_headers(dbsub),
-    )
+    content = "\n".join(links) if links else ""
+    headers = get_headers(dbsub)
+    etag = get_etag(content, headers)
+    GuardCache.set(key, (dbsub.id, content, headers, etag), tag=dbsub.id)
+    return _respond(request, content, headers, etag)
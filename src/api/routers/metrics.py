@@ -0,0 +1,18 @@
+from fastapi import APIRouter, HTTPException, Request
+from src.config import METRICS_TOKEN
+from src.utils.metrics import Metrics
+
+
+router = APIRouter(
+    prefix="/api/metrics",
+    tags=["Metrics"],
+    include_in_schema=False,
+)
+
+
+@router.get("")
+async def get_metrics(request: Request):
+    """Expose process-local metrics to callers holding the metrics token."""
+    if not METRICS_TOKEN or request.headers.get("X-Metrics-Token") != METRICS_TOKEN:
+        raise HTTPException(status_code=404)
+    return Metrics.snapshot()
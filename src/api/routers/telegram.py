@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Request, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Request, HTTPException
 from eiogram.types import Update
-from src.config import TELEGRAM_WEBHOOK_SECRET_KEY, DP, BOT
+from src.config import TELEGRAM_WEBHOOK_SECRET_KEY, TELEGRAM_WORKERS, TELEGRAM_QUEUE_SIZE, DP, BOT
+from src.handlers.middlewares import authorize
+from src.utils.dispatcher import KeyedWorkerPool
 
 
 router = APIRouter(
@@ -9,9 +11,17 @@ router = APIRouter(
     include_in_schema=False,
 )
 
+TelegramUpdates = KeyedWorkerPool("telegram", DP.process, TELEGRAM_WORKERS, TELEGRAM_QUEUE_SIZE)
+
+
+def _chat_key(update: Update) -> int:
+    origin = update.origin
+    user = getattr(origin, "from_user", None) if origin else None
+    return user.id if user else 0
+
 
 @router.post("/webhook")
-async def telegram_webhook(request: Request, bg: BackgroundTasks):
+async def telegram_webhook(request: Request):
     """Handle incoming webhook updates from Telegram."""
     if TELEGRAM_WEBHOOK_SECRET_KEY:
         secret_token = request.headers.get("X-Telegram-Bot-Api-Secret-Token")
@@ -20,5 +30,10 @@ async def telegram_webhook(request: Request, bg: BackgroundTasks):
     data = await request.json()
     data["bot"] = BOT
     update = Update(**data)
-    bg.add_task(DP.process, update)
+    key = _chat_key(update)
+    # Checked before queueing: DP.process loads the FSM context from storage before any middleware runs.
+    if not authorize(key):
+        return {"result": "ignored"}
+    if not TelegramUpdates.submit(key, update):
+        raise HTTPException(status_code=503, detail="Too many pending updates")
     return {"result": "success"}
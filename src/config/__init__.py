@@ -1,17 +1,48 @@
 from .env import (
     DEBUG,
     DOCS,
+    METRICS_TOKEN,
+    ROLE,
     SQLALCHEMY_DATABASE_URL,
+    DATABASE_POOL_SIZE,
+    DATABASE_POOL_SIZE_SCHEDULER,
+    DATABASE_POOL_SIZE_BOT,
+    TOUCH_FLUSH_INTERVAL,
+    CACHE_BUS_CHANNEL,
     TELEGRAM_ADMINS_ID,
     TELEGRAM_API_TOKEN,
     TELEGRAM_LOGGER_GROUP_ID,
     TELEGRAM_WEBHOOK_HOST,
     TELEGRAM_WEBHOOK_SECRET_KEY,
+    TELEGRAM_WORKERS,
+    TELEGRAM_QUEUE_SIZE,
+    FSM_STORAGE,
+    FSM_CACHE_SIZE,
+    FSM_FLUSH_INTERVAL,
     SUBSCRIPTION_DOMAIN_PREFIX,
+    GUARD_CACHE_TTL,
+    GUARD_CACHE_SIZE,
     UVICORN_HOST,
+    UVICORN_WORKERS,
     UVICORN_PORT,
     UVICORN_SSL_KEYFILE,
     UVICORN_SSL_CERTFILE,
+    SUBS_CHECKER_CONCURRENCY,
+    SUBS_CHECKER_INTERVAL,
+    SCHEDULER_LOCK_KEY,
+    LEADER_RETRY_INTERVAL,
+    XUI_HTTP2,
+    XUI_MAX_CONNECTIONS,
+    XUI_MAX_KEEPALIVE_CONNECTIONS,
+    XUI_KEEPALIVE_EXPIRY,
+    XUI_CLIENT_IDLE_TTL,
+    XUI_TIMEOUT,
+    XUI_CREATE_CHUNK_SIZE,
+    XUI_LINKS_TIMEOUT,
+    XUI_LINKS_DEADLINE,
+    XUI_LINKS_STALE_TTL,
+    LINK_SNAPSHOT_PATH,
+    LINK_REFRESH_INTERVAL,
 )
 from .tg import BOT, DP
 from .log import logger
@@ -19,18 +50,49 @@ from .log import logger
 __all__ = [
     "DOCS",
     "DEBUG",
+    "METRICS_TOKEN",
+    "ROLE",
     "SQLALCHEMY_DATABASE_URL",
+    "DATABASE_POOL_SIZE",
+    "DATABASE_POOL_SIZE_SCHEDULER",
+    "DATABASE_POOL_SIZE_BOT",
+    "TOUCH_FLUSH_INTERVAL",
+    "CACHE_BUS_CHANNEL",
     "TELEGRAM_ADMINS_ID",
     "TELEGRAM_API_TOKEN",
     "TELEGRAM_LOGGER_GROUP_ID",
     "TELEGRAM_WEBHOOK_HOST",
     "TELEGRAM_WEBHOOK_SECRET_KEY",
+    "TELEGRAM_WORKERS",
+    "TELEGRAM_QUEUE_SIZE",
+    "FSM_STORAGE",
+    "FSM_CACHE_SIZE",
+    "FSM_FLUSH_INTERVAL",
     "BOT",
     "DP",
     "SUBSCRIPTION_DOMAIN_PREFIX",
+    "GUARD_CACHE_TTL",
+    "GUARD_CACHE_SIZE",
     "UVICORN_HOST",
+    "UVICORN_WORKERS",
     "UVICORN_PORT",
     "UVICORN_SSL_KEYFILE",
     "UVICORN_SSL_CERTFILE",
+    "SUBS_CHECKER_CONCURRENCY",
+    "SUBS_CHECKER_INTERVAL",
+    "SCHEDULER_LOCK_KEY",
+    "LEADER_RETRY_INTERVAL",
+    "XUI_HTTP2",
+    "XUI_MAX_CONNECTIONS",
+    "XUI_MAX_KEEPALIVE_CONNECTIONS",
+    "XUI_KEEPALIVE_EXPIRY",
+    "XUI_CLIENT_IDLE_TTL",
+    "XUI_TIMEOUT",
+    "XUI_CREATE_CHUNK_SIZE",
+    "XUI_LINKS_TIMEOUT",
+    "XUI_LINKS_DEADLINE",
+    "XUI_LINKS_STALE_TTL",
+    "LINK_SNAPSHOT_PATH",
+    "LINK_REFRESH_INTERVAL",
     "logger",
 ]
@@ -1,4 +1,17 @@
 from .core import GetDB, AsyncSession, Base
 from .models import *  # noqa
+from .bus import CacheBus, CacheEvent
+from .leader import LeaderElection
+from .buffer import TouchBuffer, SubscriptionTouches, UserTouches
 
-__all__ = ["GetDB", "AsyncSession", "Base"]
+__all__ = [
+    "GetDB",
+    "AsyncSession",
+    "Base",
+    "CacheBus",
+    "CacheEvent",
+    "LeaderElection",
+    "TouchBuffer",
+    "SubscriptionTouches",
+    "UserTouches",
+]
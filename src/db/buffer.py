@@ -0,0 +1,73 @@
+import asyncio
+from datetime import datetime
+from time import monotonic
+from typing import Dict, Optional, Type
+from sqlalchemy import update, bindparam
+
+from src.config import TOUCH_FLUSH_INTERVAL, logger
+from src.utils.metrics import Metrics
+from .core import Base, GetDB
+from .models import Subscription, User
+
+
+class TouchBuffer:
+    """Coalesce "last seen" timestamps in memory and write them in one batched UPDATE."""
+
+    def __init__(self, model: Type[Base], column: str):
+        self.model = model
+        self.column = column
+        self.name = f"touch.{model.__tablename__}.{column}"
+        self._pending: Dict[int, datetime] = {}
+        self._oldest: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def touch(self, id: int, at: Optional[datetime] = None) -> None:
+        if self._oldest is None:
+            self._oldest = monotonic()
+        self._pending[id] = at or datetime.now()
+        Metrics.gauge(f"{self.name}.pending", len(self._pending))
+
+    async def flush(self) -> int:
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        lag = monotonic() - self._oldest
+        self._oldest = None
+        table = self.model.__table__
+        keep = {c.name: c for c in table.c if c.onupdate is not None and c.name != self.column}
+        stmt = update(table).where(table.c.id == bindparam("b_id")).values({self.column: bindparam("b_value"), **keep})
+        try:
+            async with GetDB() as db:
+                await db.execute(stmt, [{"b_id": id, "b_value": value} for id, value in pending.items()])
+        except Exception as e:
+            for id, value in pending.items():
+                self._pending.setdefault(id, value)
+            self._oldest = self._oldest or monotonic() - lag
+            logger.error(f"Flushing {self.name} failed: {e}")
+            return 0
+        Metrics.gauge(f"{self.name}.pending", len(self._pending))
+        Metrics.observe(f"{self.name}.flush_size", len(pending))
+        Metrics.observe(f"{self.name}.flush_lag", lag)
+        return len(pending)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(TOUCH_FLUSH_INTERVAL)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+
+SubscriptionTouches = TouchBuffer(Subscription, "last_sub_updated_at")
+UserTouches = TouchBuffer(User, "online_at")
@@ -0,0 +1,130 @@
+import asyncio
+import json
+from enum import StrEnum
+from uuid import uuid4
+from typing import Callable, Dict, Iterable, List, Optional
+
+import asyncpg
+from sqlalchemy import select, func
+from sqlalchemy.event import listen
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.config import CACHE_BUS_CHANNEL, logger
+from src.utils.metrics import Metrics
+from .core import connect_dedicated
+
+
+class CacheEvent(StrEnum):
+    SETTING = "setting"
+    SERVER = "server"
+    SUBSCRIPTION = "subscription"
+
+
+Handler = Callable[[Optional[int], Optional[str]], None]
+
+
+class InvalidationBus:
+    """Evict process-local caches everywhere through Postgres LISTEN/NOTIFY."""
+
+    RECONNECT_DELAY = 5
+    BATCH_SIZE = 500
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self.origin = uuid4().hex
+        self._handlers: Dict[str, List[Handler]] = {}
+        self._conn: Optional[asyncpg.Connection] = None
+        self._lost = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._pending = ("cache_bus", self.origin)
+        listen(Session, "after_commit", self._after_commit)
+        listen(Session, "after_rollback", self._after_rollback)
+
+    def subscribe(self, event: CacheEvent, handler: Handler) -> None:
+        self._handlers.setdefault(event, []).append(handler)
+
+    async def publish(self, db: AsyncSession, event: CacheEvent, id: Optional[int] = None, key: Optional[str] = None) -> None:
+        """Evict here and in every other process once the transaction commits, so no reader can re-cache the old row."""
+        payload = json.dumps({"event": event, "id": id, "key": key, "origin": self.origin})
+        await db.execute(select(func.pg_notify(self.channel, payload)))
+        db.sync_session.info.setdefault(self._pending, []).append((event, id, key))
+        Metrics.incr("cache_bus.published")
+
+    async def publish_many(self, db: AsyncSession, event: CacheEvent, ids: Iterable[int]) -> None:
+        """Like publish for many ids, batched so each notification stays well under the 8000 byte payload limit."""
+        ids = list(ids)
+        for start in range(0, len(ids), self.BATCH_SIZE):
+            batch = ids[start : start + self.BATCH_SIZE]
+            payload = json.dumps({"event": event, "ids": batch, "origin": self.origin})
+            await db.execute(select(func.pg_notify(self.channel, payload)))
+            db.sync_session.info.setdefault(self._pending, []).extend((event, id, None) for id in batch)
+            Metrics.incr("cache_bus.published")
+
+    def _after_commit(self, session: Session) -> None:
+        for event, id, key in session.info.pop(self._pending, ()):
+            self._dispatch(event, id, key)
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop(self._pending, None)
+
+    def _dispatch(self, event: str, id: Optional[int], key: Optional[str]) -> None:
+        for handler in self._handlers.get(event, ()):
+            try:
+                handler(id, key)
+            except Exception as e:
+                logger.error(f"Cache bus handler for {event} failed: {e}")
+
+    def _on_notify(self, conn: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            return
+        if data.get("origin") == self.origin:
+            return
+        Metrics.incr("cache_bus.received")
+        if "ids" in data:
+            for id in data["ids"]:
+                self._dispatch(data.get("event"), id, None)
+            return
+        self._dispatch(data.get("event"), data.get("id"), data.get("key"))
+
+    def _on_terminate(self, conn: asyncpg.Connection) -> None:
+        self._lost.set()
+
+    async def _connect(self) -> asyncpg.Connection:
+        conn = await connect_dedicated()
+        conn.add_termination_listener(self._on_terminate)
+        await conn.add_listener(self.channel, self._on_notify)
+        return conn
+
+    async def _run(self) -> None:
+        while True:
+            self._lost.clear()
+            try:
+                self._conn = await self._connect()
+            except Exception as e:
+                logger.warning(f"Cache bus connection failed: {e}")
+                await asyncio.sleep(self.RECONNECT_DELAY)
+                continue
+            # Events sent while we were not listening are lost, so drop everything once.
+            for event in list(self._handlers):
+                self._dispatch(event, None, None)
+            await self._lost.wait()
+            logger.warning("Cache bus connection lost, reconnecting")
+            Metrics.incr("cache_bus.reconnects")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._conn is not None and not self._conn.is_closed():
+            await self._conn.close()
+        self._conn = None
+
+
+CacheBus = InvalidationBus(CACHE_BUS_CHANNEL)
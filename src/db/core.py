@@ -1,13 +1,20 @@
 from typing import AsyncIterator
+import asyncpg
 from contextlib import asynccontextmanager
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.exc import SQLAlchemyError
-from src.config import SQLALCHEMY_DATABASE_URL
+from src.config import (
+    ROLE,
+    SQLALCHEMY_DATABASE_URL,
+    DATABASE_POOL_SIZE,
+    DATABASE_POOL_SIZE_SCHEDULER,
+    DATABASE_POOL_SIZE_BOT,
+)
 
 engine = create_async_engine(
     SQLALCHEMY_DATABASE_URL,
-    pool_size=50,
+    pool_size={"scheduler": DATABASE_POOL_SIZE_SCHEDULER, "bot": DATABASE_POOL_SIZE_BOT}.get(ROLE, DATABASE_POOL_SIZE),
     max_overflow=-1,
     pool_timeout=30,
     pool_pre_ping=True,
@@ -23,6 +30,11 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+async def connect_dedicated() -> asyncpg.Connection:
+    """Open a raw asyncpg connection outside the pool, for listeners and session-level locks."""
+    return await asyncpg.connect(engine.url.set(drivername="postgresql").render_as_string(hide_password=False))
+
+
 class Base(DeclarativeBase):
     pass
 
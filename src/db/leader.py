@@ -0,0 +1,76 @@
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+import asyncpg
+
+from src.config import LEADER_RETRY_INTERVAL, logger
+from src.utils.metrics import Metrics
+from .core import connect_dedicated
+
+
+class LeaderElection:
+    """Elect one process through a session-level Postgres advisory lock held on a dedicated connection.
+
+    Postgres drops the lock as soon as the holder's connection goes away, so a follower takes over
+    on its next attempt when the leader dies.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        key: int,
+        on_acquire: Callable[[], Awaitable[None]],
+        on_release: Callable[[], Awaitable[None]],
+    ):
+        self.name = name
+        self.key = key
+        self.on_acquire = on_acquire
+        self.on_release = on_release
+        self.leader = False
+        self._conn: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _set_leader(self, leader: bool) -> None:
+        if leader == self.leader:
+            return
+        self.leader = leader
+        Metrics.gauge(f"leader.{self.name}", int(leader))
+        if leader:
+            logger.info(f"Acquired {self.name} leadership")
+            await self.on_acquire()
+        else:
+            logger.info(f"Released {self.name} leadership")
+            await self.on_release()
+
+    async def _close(self) -> None:
+        if self._conn is not None and not self._conn.is_closed():
+            await self._conn.close()
+        self._conn = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if self._conn is None or self._conn.is_closed():
+                    self._conn = await connect_dedicated()
+                if self.leader:
+                    await self._conn.fetchval("SELECT 1", timeout=LEADER_RETRY_INTERVAL)
+                elif await self._conn.fetchval("SELECT pg_try_advisory_lock($1)", self.key, timeout=LEADER_RETRY_INTERVAL):
+                    await self._set_leader(True)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"{self.name.title()} leader election failed: {e}")
+                await self._close()
+                await self._set_leader(False)
+            await asyncio.sleep(LEADER_RETRY_INTERVAL)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self._set_leader(False)
+        await self._close()
@@ -0,0 +1,54 @@
+"""search trgm indexes
+
+Revision ID: 3a6c0e8f71b5
+Revises: 9d2f5b81c4e7
+Create Date: 2026-10-18 16:40:12.774105
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3a6c0e8f71b5"
+down_revision: Union[str, Sequence[str], None] = "9d2f5b81c4e7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_subscriptions_remark_trgm",
+        "subscriptions",
+        ["remark"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"remark": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_subscriptions_access_key_trgm",
+        "subscriptions",
+        ["access_key"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"access_key": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_users_full_name_trgm",
+        "users",
+        ["full_name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"full_name": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_users_full_name_trgm", table_name="users")
+    op.drop_index("ix_subscriptions_access_key_trgm", table_name="subscriptions")
+    op.drop_index("ix_subscriptions_remark_trgm", table_name="subscriptions")
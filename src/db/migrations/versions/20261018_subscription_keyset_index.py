@@ -0,0 +1,28 @@
+"""subscription keyset index
+
+Revision ID: 9d2f5b81c4e7
+Revises: e15a7c3b9046
+Create Date: 2026-10-18 15:02:41.530218
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9d2f5b81c4e7"
+down_revision: Union[str, Sequence[str], None] = "e15a7c3b9046"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_subscriptions_created_at_id", "subscriptions", ["created_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_subscriptions_created_at_id", table_name="subscriptions")
@@ -0,0 +1,37 @@
+"""subscription state indexes
+
+Revision ID: e15a7c3b9046
+Revises: 4b9f63e0d2a7
+Create Date: 2026-10-18 12:26:05.108377
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e15a7c3b9046"
+down_revision: Union[str, Sequence[str], None] = "4b9f63e0d2a7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f("ix_subscriptions_expire"), "subscriptions", ["expire"], unique=False)
+    op.create_index(
+        "ix_subscriptions_left_usage",
+        "subscriptions",
+        [sa.text("(limit_usage - (lifetime_usage - offset_usage))")],
+        unique=False,
+        postgresql_where=sa.text("limit_usage <> 0"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_subscriptions_left_usage", table_name="subscriptions")
+    op.drop_index(op.f("ix_subscriptions_expire"), table_name="subscriptions")
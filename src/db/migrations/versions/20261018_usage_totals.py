@@ -0,0 +1,43 @@
+"""usage totals
+
+Revision ID: 4b9f63e0d2a7
+Revises: 7c4e2a9d1f08
+Create Date: 2026-10-18 11:03:27.641930
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4b9f63e0d2a7"
+down_revision: Union[str, Sequence[str], None] = "7c4e2a9d1f08"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("subscriptions", sa.Column("lifetime_usage", sa.BigInteger(), server_default="0", nullable=False))
+    op.add_column("subscriptions", sa.Column("last_online_at", sa.DateTime(), nullable=True))
+    op.execute(
+        """
+        UPDATE subscriptions
+        SET lifetime_usage = totals.total, last_online_at = totals.last
+        FROM (
+            SELECT sub_id, SUM(usage) AS total, MAX(updated_at) AS last
+            FROM subscription_usages
+            GROUP BY sub_id
+        ) AS totals
+        WHERE subscriptions.id = totals.sub_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("subscriptions", "last_online_at")
+    op.drop_column("subscriptions", "lifetime_usage")
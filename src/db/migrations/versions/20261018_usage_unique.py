@@ -0,0 +1,43 @@
+"""usage unique
+
+Revision ID: 7c4e2a9d1f08
+Revises: 32760534c6e1
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c4e2a9d1f08"
+down_revision: Union[str, Sequence[str], None] = "32760534c6e1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        """
+        DELETE FROM subscription_usages a
+        USING subscription_usages b
+        WHERE a.id < b.id
+          AND a.sub_id = b.sub_id
+          AND a.server_id = b.server_id
+          AND a.inbound_id = b.inbound_id
+          AND a.client_id = b.client_id
+        """
+    )
+    op.create_unique_constraint(
+        "uq_subscription_usages_client",
+        "subscription_usages",
+        ["sub_id", "server_id", "inbound_id", "client_id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("uq_subscription_usages_client", "subscription_usages", type_="unique")
@@ -1,6 +1,16 @@
 from .settings import Setting
 from .user import User, UserMessage, UserState
 from .servers import Server, ServerAccess
-from .subscription import Subscription, SubscriptionUsage
+from .subscription import Subscription, SubscriptionUsage, LoadProfile
 
-__all__ = ["Setting", "User", "UserMessage", "UserState", "Server", "ServerAccess", "Subscription", "SubscriptionUsage"]
+__all__ = [
+    "Setting",
+    "User",
+    "UserMessage",
+    "UserState",
+    "Server",
+    "ServerAccess",
+    "Subscription",
+    "SubscriptionUsage",
+    "LoadProfile",
+]
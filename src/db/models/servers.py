@@ -1,6 +1,6 @@
 import json
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, ClassVar
 
 from sqlalchemy import (
     String,
@@ -18,8 +18,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.hybrid import hybrid_property
 
 from src.utils.times import time_diff
-from src.utils.pagination import Pagination
+from src.utils.pagination import Pagination, paginate
+from src.utils.cache import GuardCache
 from ..core import Base
+from ..bus import CacheBus, CacheEvent
 
 
 class ServerAccess(Base):
@@ -34,6 +36,7 @@ class ServerAccess(Base):
 
 class Server(Base):
     __tablename__ = "servers"
+    _count: ClassVar[Optional[int]] = None
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     remark: Mapped[str] = mapped_column(String(128), nullable=False)
@@ -121,27 +124,25 @@ class Server(Base):
         return result.scalars().first()
 
     @classmethod
-    async def get_paginated(cls, db: AsyncSession, page: int, limit: int = 20) -> Pagination:
-        total_result = await db.execute(
-            select(func.count()).where(cls.removed == False).select_from(cls)  # noqa
-        )
-        total_items = total_result.scalar() or 0
-        total_pages = (total_items + limit - 1) // limit if total_items > 0 else 0
-        if total_pages == 0:
-            return Pagination(items=[], total=0, current=1, back=None, next=None)
-        current = max(1, min(page, total_pages))
-        query = (
-            select(cls)
-            .where(cls.removed == False)  # noqa
-            .order_by(cls.created_at.desc())
-            .offset((current - 1) * limit)
-            .limit(limit)
+    async def count(cls, db: AsyncSession) -> int:
+        if cls._count is None:
+            result = await db.execute(
+                select(func.count()).where(cls.removed == False).select_from(cls)  # noqa
+            )
+            cls._count = result.scalar() or 0
+        return cls._count
+
+    @classmethod
+    async def get_paginated(cls, db: AsyncSession, cursor: Optional[int] = None, limit: int = 20) -> Pagination:
+        return await paginate(
+            db,
+            select(cls).where(cls.removed == False),  # noqa
+            order=cls.created_at,
+            id=cls.id,
+            cursor=cursor,
+            total_items=await cls.count(db),
+            limit=limit,
         )
-        result = await db.execute(query)
-        items = result.scalars().all()
-        back = current - 1 if current > 1 else None
-        next = current + 1 if current < total_pages else None
-        return Pagination(items=items, total=total_pages, current=current, back=back, next=next)
 
     @classmethod
     async def get_all(
@@ -177,6 +178,7 @@ class Server(Base):
         )
         db.add(item)
         await db.flush()
+        await CacheBus.publish(db, CacheEvent.SERVER, item.id)
         return item
 
     @classmethod
@@ -211,9 +213,19 @@ class Server(Base):
             server.config = config
 
         await db.flush()
+        await CacheBus.publish(db, CacheEvent.SERVER, server.id)
         return server
 
     @classmethod
     async def remove(cls, db: AsyncSession, *, server: "Server") -> None:
         server.removed = True
         await db.flush()
+        await CacheBus.publish(db, CacheEvent.SERVER, server.id)
+
+    @classmethod
+    def evict(cls, id: Optional[int] = None, key: Optional[str] = None) -> None:
+        cls._count = None
+        GuardCache.clear()
+
+
+CacheBus.subscribe(CacheEvent.SERVER, Server.evict)
@@ -4,7 +4,9 @@ from sqlalchemy import Integer, Boolean, JSON
 from sqlalchemy.sql import select
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.ext.asyncio import AsyncSession
+from src.utils.cache import GuardCache
 from ..core import Base
+from ..bus import CacheBus, CacheEvent
 
 
 class Setting(Base):
@@ -52,5 +54,14 @@ class Setting(Base):
             setting.informations = informations
 
         await db.flush()
+        await CacheBus.publish(db, CacheEvent.SETTING)
         cls._cache = deepcopy(setting)
         return setting
+
+    @classmethod
+    def evict(cls, id: Optional[int] = None, key: Optional[str] = None) -> None:
+        cls._cache = None
+        GuardCache.clear()
+
+
+CacheBus.subscribe(CacheEvent.SETTING, Setting.evict)
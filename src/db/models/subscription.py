@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
-from typing import Optional, Dict, TYPE_CHECKING, List
+from enum import StrEnum
+from typing import Optional, Dict, TYPE_CHECKING, Iterable, List, Tuple, ClassVar
 from xmlrpc.client import Server
 from sqlalchemy import (
     String,
@@ -8,25 +9,46 @@ from sqlalchemy import (
     BigInteger,
     Boolean,
     select,
+    update,
+    tuple_,
     ForeignKey,
+    UniqueConstraint,
+    Index,
+    text,
     func,
+    and_,
+    or_,
+    not_,
+    case,
+    literal_column,
 )
-from sqlalchemy.orm import mapped_column, Mapped, relationship, selectinload
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import mapped_column, Mapped, relationship, selectinload, lazyload, load_only, raiseload
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.hybrid import hybrid_property
 
 from src.config import SUBSCRIPTION_DOMAIN_PREFIX
 from src.utils.times import time_diff
-from src.utils.pagination import Pagination
+from src.utils.pagination import Pagination, paginate
+from src.utils.cache import GuardCache
 from ..core import Base
+from ..bus import CacheBus, CacheEvent
 
 if TYPE_CHECKING:
     from .user import User
     from .servers import Server
 
 
+class LoadProfile(StrEnum):
+    LISTING = "listing"
+    DETAIL = "detail"
+    SYNC = "sync"
+    GUARD = "guard"
+
+
 class SubscriptionUsage(Base):
     __tablename__ = "subscription_usages"
+    __table_args__ = (UniqueConstraint("sub_id", "server_id", "inbound_id", "client_id", name="uq_subscription_usages_client"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
@@ -45,6 +67,27 @@ class SubscriptionUsage(Base):
 
 class Subscription(Base):
     __tablename__ = "subscriptions"
+    __table_args__ = (
+        Index(
+            "ix_subscriptions_left_usage",
+            text("(limit_usage - (lifetime_usage - offset_usage))"),
+            postgresql_where=text("limit_usage <> 0"),
+        ),
+        Index("ix_subscriptions_created_at_id", "created_at", "id"),
+        Index(
+            "ix_subscriptions_remark_trgm",
+            "remark",
+            postgresql_using="gin",
+            postgresql_ops={"remark": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_subscriptions_access_key_trgm",
+            "access_key",
+            postgresql_using="gin",
+            postgresql_ops={"access_key": "gin_trgm_ops"},
+        ),
+    )
+    _count: ClassVar[Optional[int]] = None
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, index=True)
 
@@ -58,58 +101,35 @@ class Subscription(Base):
 
     owner: Mapped[Optional[int]] = mapped_column(BigInteger, ForeignKey("users.id"), nullable=True, index=True)
 
-    expire: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    expire: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
     limit_usage: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
     offset_usage: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    lifetime_usage: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0", nullable=False)
+
+    last_online_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
 
     last_sub_updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, nullable=False)
     updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, onupdate=datetime.now, nullable=True)
 
-    user: Mapped[Optional["User"]] = relationship("User", back_populates=None, lazy="selectin")
-    usages: Mapped[List["SubscriptionUsage"]] = relationship("SubscriptionUsage", uselist=True, lazy="selectin")
+    user: Mapped[Optional["User"]] = relationship("User", back_populates=None, lazy="select")
+    usages: Mapped[List["SubscriptionUsage"]] = relationship("SubscriptionUsage", uselist=True, lazy="select")
 
     @hybrid_property
     def online_at(self) -> Optional[datetime]:
-        if not self.usages:
-            return None
-        latest_usage = max(self.usages, key=lambda u: u.updated_at or u.created_at)
-        return latest_usage.updated_at
-
-    @online_at.expression
-    def online_at(cls):
-        if not cls.usages:
-            return None
-        latest_usage = max(cls.usages, key=lambda u: u.updated_at or u.created_at)
-        return latest_usage.updated_at
+        return self.last_online_at
 
     @hybrid_property
     def current_usage(self) -> int:
-        if not self.usages:
-            return 0
         return self.lifetime_usage - self.offset_usage
 
-    @current_usage.expression
-    def current_usage(cls):
-        if not cls.usages:
-            return 0
-        return cls.lifetime_usage - cls.offset_usage
-
     @hybrid_property
     def is_inactive(self) -> bool:
         return self.expired or self.limited
 
     @is_inactive.expression
     def is_inactive(cls):
-        return cls.expired or cls.limited
-
-    @hybrid_property
-    def lifetime_usage(self) -> int:
-        return sum(usage.usage for usage in self.usages) if self.usages else 0
-
-    @lifetime_usage.expression
-    def lifetime_usage(cls):
-        return sum(usage.usage for usage in cls.usages) if cls.usages else 0
+        return or_(cls.expired, cls.limited)
 
     @hybrid_property
     def left_usage(self) -> int:
@@ -117,7 +137,7 @@ class Subscription(Base):
 
     @left_usage.expression
     def left_usage(cls):
-        return cls.limit_usage - cls.current_usage if cls.limit_usage != 0 else 0
+        return case((cls.limit_usage != literal_column("0"), cls.limit_usage - cls.current_usage), else_=0)
 
     @hybrid_property
     def is_active(self) -> bool:
@@ -125,7 +145,13 @@ class Subscription(Base):
 
     @is_active.expression
     def is_active(cls):
-        return cls.activated and cls.enabled and not cls.limited and not cls.expired and not cls.removed
+        return and_(
+            cls.activated == True,  # noqa
+            cls.enabled == True,  # noqa
+            not_(cls.limited),
+            not_(cls.expired),
+            cls.removed.is_not(True),
+        )
 
     @hybrid_property
     def is_activate_expire(self) -> bool:
@@ -153,7 +179,13 @@ class Subscription(Base):
 
     @availabled.expression
     def availabled(cls):
-        return cls.enabled and cls.activated and not cls.removed and not cls.expired and not cls.limited
+        return and_(
+            cls.enabled == True,  # noqa
+            cls.activated == True,  # noqa
+            cls.removed.is_not(True),
+            not_(cls.expired),
+            not_(cls.limited),
+        )
 
     @property
     def link(self) -> str:
@@ -175,7 +207,8 @@ class Subscription(Base):
 
     @limited.expression
     def limited(cls):
-        return cls.limit_usage != 0 and int(cls.limit_usage - cls.current_usage) <= 0
+        # Inline 0 so the predicate matches the partial ix_subscriptions_left_usage index even in generic plans.
+        return and_(cls.limit_usage != literal_column("0"), cls.limit_usage - cls.current_usage <= 0)
 
     @hybrid_property
     def expired(self) -> bool:
@@ -183,7 +216,7 @@ class Subscription(Base):
 
     @expired.expression
     def expired(cls):
-        return cls.expire > 0 and int(datetime.now().timestamp()) > cls.expire
+        return and_(cls.expire > 0, cls.expire < func.floor(func.extract("epoch", func.now())))
 
     @property
     def left_usage_gb(self) -> str:
@@ -265,46 +298,91 @@ class Subscription(Base):
     async def activate_expire(cls, db: AsyncSession, sub: "Subscription") -> "Subscription":
         if sub.expire < 0:
             sub.expire = int((datetime.now() + timedelta(seconds=abs(sub.expire))).timestamp())
-            await db.commit()
+            await db.flush()
+            await CacheBus.publish(db, CacheEvent.SUBSCRIPTION, sub.id, sub.access_key)
         return sub
 
     @classmethod
-    async def get_by_server_key(cls, db: AsyncSession, key: str) -> Optional["Subscription"]:
+    def loader(cls, profile: LoadProfile) -> list:
+        """Loader options that fetch only what the given profile's screen or job reads."""
+        from .servers import Server
+        from .user import User
+
+        if profile == LoadProfile.LISTING:
+            return [
+                load_only(
+                    cls.id,
+                    cls.remark,
+                    cls.enabled,
+                    cls.activated,
+                    cls.removed,
+                    cls.expire,
+                    cls.limit_usage,
+                    cls.lifetime_usage,
+                    cls.offset_usage,
+                    cls.owner,
+                    cls.created_at,
+                ),
+                selectinload(cls.user).load_only(User.id, User.full_name),
+                raiseload(cls.usages),
+            ]
+        if profile == LoadProfile.DETAIL:
+            return [
+                selectinload(cls.user),
+                selectinload(cls.usages).selectinload(SubscriptionUsage.server).lazyload(Server.server_access),
+            ]
+        return [raiseload(cls.user), raiseload(cls.usages)]
+
+    @classmethod
+    async def get_by_server_key(
+        cls, db: AsyncSession, key: str, profile: LoadProfile = LoadProfile.SYNC
+    ) -> Optional["Subscription"]:
         result = await db.execute(
-            select(cls)
-            .options(selectinload(cls.usages), selectinload(cls.user))
-            .where(cls.server_key == key)
-            .where(cls.removed == False)  # noqa
+            select(cls).options(*cls.loader(profile)).where(cls.server_key == key).where(cls.removed == False)  # noqa
         )
         return result.scalars().first()
 
     @classmethod
-    async def get_by_access_key(cls, db: AsyncSession, key: str) -> Optional["Subscription"]:
+    async def get_by_access_key(
+        cls, db: AsyncSession, key: str, profile: LoadProfile = LoadProfile.GUARD
+    ) -> Optional["Subscription"]:
         result = await db.execute(
-            select(cls)
-            .options(selectinload(cls.usages), selectinload(cls.user))
-            .where(cls.access_key == key)
-            .where(cls.removed == False)  # noqa
+            select(cls).options(*cls.loader(profile)).where(cls.access_key == key).where(cls.removed == False)  # noqa
         )
         return result.scalars().first()
 
     @classmethod
-    async def get_by_id(cls, db: AsyncSession, id: int) -> Optional["Subscription"]:
+    async def get_for_guard(cls, db: AsyncSession, key: str) -> Optional[Tuple["Subscription", List["Server"]]]:
+        """Load a subscription and the available servers in one round trip, without relationships."""
+        from .servers import Server
+
         result = await db.execute(
-            select(cls)
-            .options(selectinload(cls.usages), selectinload(cls.user))
-            .where(cls.id == id)
+            select(cls, Server)
+            .outerjoin(Server, and_(Server.availabled))
+            .options(*cls.loader(LoadProfile.GUARD), lazyload(Server.server_access))
+            .where(cls.access_key == key)
             .where(cls.removed == False)  # noqa
+            .order_by(cls.id, Server.created_at.desc())
+        )
+        rows = result.all()
+        if not rows:
+            return None
+        sub = rows[0][0]
+        return sub, [server for item, server in rows if item is sub and server is not None]
+
+    @classmethod
+    async def get_by_id(cls, db: AsyncSession, id: int, profile: LoadProfile = LoadProfile.DETAIL) -> Optional["Subscription"]:
+        result = await db.execute(
+            select(cls).options(*cls.loader(profile)).where(cls.id == id).where(cls.removed == False)  # noqa
         )
         return result.scalars().first()
 
     @classmethod
-    async def get_by_remark(cls, db: AsyncSession, remark: str) -> Optional["Subscription"]:
+    async def get_by_remark(
+        cls, db: AsyncSession, remark: str, profile: LoadProfile = LoadProfile.SYNC
+    ) -> Optional["Subscription"]:
         result = await db.execute(
-            select(cls)
-            .options(selectinload(cls.usages), selectinload(cls.user))
-            .where(cls.remark == remark)
-            .where(cls.removed == False)  # noqa
+            select(cls).options(*cls.loader(profile)).where(cls.remark == remark).where(cls.removed == False)  # noqa
         )
         return result.scalars().first()
 
@@ -330,6 +408,7 @@ class Subscription(Base):
         )
         db.add(item)
         await db.flush()
+        await CacheBus.publish(db, CacheEvent.SUBSCRIPTION, item.id, item.access_key)
         return item
 
     @classmethod
@@ -362,10 +441,12 @@ class Subscription(Base):
             sub.server_key = server_key
 
         await db.flush()
+        await CacheBus.publish(db, CacheEvent.SUBSCRIPTION, sub.id, sub.access_key)
         return sub
 
     @classmethod
     async def revoke(cls, db: AsyncSession, sub: "Subscription") -> "Subscription":
+        await CacheBus.publish(db, CacheEvent.SUBSCRIPTION, sub.id, sub.access_key)
         sub.access_key = cls.generate_key()
         await db.flush()
         return sub
@@ -374,6 +455,7 @@ class Subscription(Base):
     async def remove(cls, db: AsyncSession, sub: "Subscription") -> None:
         sub.removed = True
         await db.flush()
+        await CacheBus.publish(db, CacheEvent.SUBSCRIPTION, sub.id, sub.access_key)
 
     @classmethod
     async def get_all(
@@ -381,76 +463,208 @@ class Subscription(Base):
         db: AsyncSession,
         *,
         removed: bool = False,
+        availabled: Optional[bool] = None,
+        expired: Optional[bool] = None,
+        limited: Optional[bool] = None,
+        profile: LoadProfile = LoadProfile.SYNC,
     ) -> List["Subscription"]:
-        query = select(cls).options(selectinload(cls.usages), selectinload(cls.user)).order_by(cls.created_at.desc())
+        query = select(cls).options(*cls.loader(profile)).order_by(cls.created_at.desc())
         if removed is not None:
             query = query.where(cls.removed == removed)
+        if availabled is not None:
+            query = query.filter(cls.availabled == availabled)
+        if expired is not None:
+            query = query.filter(cls.expired == expired)
+        if limited is not None:
+            query = query.filter(cls.limited == limited)
         result = await db.execute(query)
         return result.scalars().all()
 
     @classmethod
-    async def get_paginated(cls, db: AsyncSession, page: int, limit: int = 20) -> Pagination:
-        total_result = await db.execute(
-            select(func.count()).where(cls.removed == False).select_from(cls)  # noqa
+    async def count(cls, db: AsyncSession) -> int:
+        if cls._count is None:
+            result = await db.execute(
+                select(func.count()).where(cls.removed == False).select_from(cls)  # noqa
+            )
+            cls._count = result.scalar() or 0
+        return cls._count
+
+    @classmethod
+    async def get_paginated(
+        cls,
+        db: AsyncSession,
+        cursor: Optional[int] = None,
+        limit: int = 20,
+        profile: LoadProfile = LoadProfile.LISTING,
+    ) -> Pagination:
+        return await paginate(
+            db,
+            select(cls).options(*cls.loader(profile)).where(cls.removed == False),  # noqa
+            order=cls.created_at,
+            id=cls.id,
+            cursor=cursor,
+            total_items=await cls.count(db),
+            limit=limit,
         )
-        total_items = total_result.scalar() or 0
-        total_pages = (total_items + limit - 1) // limit if total_items > 0 else 0
-        if total_pages == 0:
-            return Pagination(items=[], total=0, current=1, back=None, next=None)
-        current = max(1, min(page, total_pages))
-        query = (
+
+    @classmethod
+    async def search(
+        cls,
+        db: AsyncSession,
+        query: str,
+        limit: int = 20,
+        profile: LoadProfile = LoadProfile.LISTING,
+    ) -> List["Subscription"]:
+        """Match remark, owner name or access key by substring, listing prefix matches first."""
+        from .user import User
+
+        query = query.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        if not query:
+            return []
+        contains, prefix = f"%{query}%", f"{query}%"
+        result = await db.execute(
             select(cls)
+            .options(*cls.loader(profile))
+            .outerjoin(User, cls.user)
             .where(cls.removed == False)  # noqa
-            .order_by(cls.created_at.desc())
-            .offset((current - 1) * limit)
+            .where(
+                or_(
+                    cls.remark.ilike(contains, escape="\\"),
+                    cls.access_key.ilike(contains, escape="\\"),
+                    User.full_name.ilike(contains, escape="\\"),
+                )
+            )
+            .order_by(
+                case(
+                    (or_(cls.remark.ilike(prefix, escape="\\"), cls.access_key.ilike(prefix, escape="\\")), 0),
+                    else_=1,
+                ),
+                cls.created_at.desc(),
+            )
             .limit(limit)
         )
+        return result.scalars().all()
+
+    @classmethod
+    async def get_expire_deadlines(cls, db: AsyncSession, ids: Optional[Iterable[int]] = None) -> List[Tuple[int, int]]:
+        """Return (id, expire) for available subscriptions that have a fixed expire timestamp."""
+        query = select(cls.id, cls.expire).where(cls.availabled).where(cls.expire > 0)
+        if ids is not None:
+            query = query.where(cls.id.in_(list(ids)))
         result = await db.execute(query)
-        items = result.scalars().all()
-        back = current - 1 if current > 1 else None
-        next = current + 1 if current < total_pages else None
-        return Pagination(items=items, total=total_pages, current=current, back=back, next=next)
+        return [(id, expire) for id, expire in result.all()]
 
     @classmethod
-    async def upsert_usage(
-        cls,
-        db: AsyncSession,
-        *,
-        sub_id: int,
-        server_id: int,
-        inbound_id: int,
-        client_id: int,
-        usage: int,
-    ) -> None:
-        existing = await db.execute(
-            select(SubscriptionUsage)
-            .where(SubscriptionUsage.sub_id == sub_id)
-            .where(SubscriptionUsage.server_id == server_id)
-            .where(SubscriptionUsage.inbound_id == inbound_id)
-            .where(SubscriptionUsage.client_id == client_id)
+    async def get_usage_map(cls, db: AsyncSession) -> Dict[tuple, int]:
+        result = await db.execute(
+            select(
+                SubscriptionUsage.sub_id,
+                SubscriptionUsage.server_id,
+                SubscriptionUsage.inbound_id,
+                SubscriptionUsage.client_id,
+                SubscriptionUsage.usage,
+            )
         )
-        existing = existing.scalars().first()
-
-        if existing:
-            if existing.usage == usage:
-                return
-            existing.usage = usage
-            existing.updated_at = datetime.now()
-        else:
-            if usage <= 0:
-                return
-            existing = SubscriptionUsage(
-                sub_id=sub_id,
-                server_id=server_id,
-                inbound_id=inbound_id,
-                client_id=client_id,
-                usage=usage,
+        return {
+            (sub_id, server_id, inbound_id, client_id): usage
+            for sub_id, server_id, inbound_id, client_id, usage in result.all()
+        }
+
+    @classmethod
+    async def upsert_usages(
+        cls, db: AsyncSession, usages: List[Dict[str, int]], chunk_size: int = 1000
+    ) -> Tuple[int, List[int]]:
+        """Write a sync pass worth of usage rows set-based.
+
+        Return how many rows actually changed and the ids of touched subscriptions that are now over their limit.
+        """
+        now = datetime.now()
+        changed = set()
+        rows = [{**usage, "created_at": now, "updated_at": now} for usage in usages if usage["usage"] > 0]
+        for start in range(0, len(rows), chunk_size):
+            stmt = insert(SubscriptionUsage).values(rows[start : start + chunk_size])
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_subscription_usages_client",
+                set_={"usage": stmt.excluded.usage, "updated_at": stmt.excluded.updated_at},
+                where=SubscriptionUsage.usage != stmt.excluded.usage,
+            ).returning(SubscriptionUsage.id, SubscriptionUsage.sub_id)
+            result = await db.execute(stmt)
+            changed.update(result.all())
+
+        resets = [
+            (usage["sub_id"], usage["server_id"], usage["inbound_id"], usage["client_id"])
+            for usage in usages
+            if usage["usage"] <= 0
+        ]
+        for start in range(0, len(resets), chunk_size):
+            result = await db.execute(
+                update(SubscriptionUsage)
+                .where(
+                    tuple_(
+                        SubscriptionUsage.sub_id,
+                        SubscriptionUsage.server_id,
+                        SubscriptionUsage.inbound_id,
+                        SubscriptionUsage.client_id,
+                    ).in_(resets[start : start + chunk_size])
+                )
+                .where(SubscriptionUsage.usage != 0)
+                .values(usage=0, updated_at=now)
+                .returning(SubscriptionUsage.id, SubscriptionUsage.sub_id)
+                .execution_options(synchronize_session=False)
+            )
+            changed.update(result.all())
+
+        limited = await cls.refresh_usage_totals(db, {sub_id for _, sub_id in changed}, chunk_size=chunk_size)
+        return len(changed), limited
+
+    @classmethod
+    async def refresh_usage_totals(cls, db: AsyncSession, sub_ids: Iterable[int], chunk_size: int = 1000) -> List[int]:
+        """Roll the usage rows of the given subscriptions up into lifetime_usage and last_online_at.
+
+        Return the ids among them that are limited after the refresh. Their cached guard
+        entries are evicted in every process once the caller commits.
+        """
+        sub_ids = list(sub_ids)
+        limited = []
+        for start in range(0, len(sub_ids), chunk_size):
+            totals = (
+                select(
+                    SubscriptionUsage.sub_id,
+                    func.sum(SubscriptionUsage.usage).label("total"),
+                    func.max(SubscriptionUsage.updated_at).label("last"),
+                )
+                .where(SubscriptionUsage.sub_id.in_(sub_ids[start : start + chunk_size]))
+                .group_by(SubscriptionUsage.sub_id)
+                .subquery()
+            )
+            result = await db.execute(
+                update(cls)
+                .where(cls.id == totals.c.sub_id)
+                .values(lifetime_usage=totals.c.total, last_online_at=totals.c.last, updated_at=cls.updated_at)
+                .returning(cls.id, cls.limited)
+                .execution_options(synchronize_session=False)
             )
-            db.add(existing)
-        return
+            limited.extend(sub_id for sub_id, is_limited in result.all() if is_limited)
+        await CacheBus.publish_many(db, CacheEvent.SUBSCRIPTION, sub_ids)
+        return limited
 
     @classmethod
     async def reset_usage(cls, db: AsyncSession, sub: "Subscription") -> "Subscription":
         sub.offset_usage = sub.lifetime_usage
         await db.flush()
+        await CacheBus.publish(db, CacheEvent.SUBSCRIPTION, sub.id, sub.access_key)
         return sub
+
+    @classmethod
+    def evict(cls, id: Optional[int] = None, key: Optional[str] = None) -> None:
+        cls._count = None
+        if id is None and key is None:
+            GuardCache.clear()
+            return
+        if key is not None:
+            GuardCache.invalidate(key)
+        if id is not None:
+            GuardCache.invalidate_tag(id)
+
+
+CacheBus.subscribe(CacheEvent.SUBSCRIPTION, Subscription.evict)
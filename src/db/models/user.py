@@ -1,14 +1,14 @@
 from datetime import datetime
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, Union, ClassVar
 from eiogram.types import User as EioUser, Message, CallbackQuery
-from sqlalchemy import String, BigInteger, DateTime, Integer, Text, JSON, func
+from sqlalchemy import String, BigInteger, DateTime, Integer, Text, JSON, Index, func
 from sqlalchemy.sql import select, delete
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.config import BOT, TELEGRAM_ADMINS_ID, logger
 from src.utils.times import time_diff
-from src.utils.pagination import Pagination
+from src.utils.pagination import Pagination, paginate
 from ..core import Base, GetDB
 
 
@@ -68,6 +68,15 @@ class UserMessage(Base):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index(
+            "ix_users_full_name_trgm",
+            "full_name",
+            postgresql_using="gin",
+            postgresql_ops={"full_name": "gin_trgm_ops"},
+        ),
+    )
+    _count: ClassVar[Optional[int]] = None
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, index=True)
     full_name: Mapped[str] = mapped_column(String(256), nullable=False)
@@ -119,27 +128,32 @@ class User(Base):
         return result.scalars().first()
 
     @classmethod
-    async def get_paginated(cls, db: AsyncSession, page: int, limit: int = 20) -> Pagination:
-        total_result = await db.execute(select(func.count()).select_from(cls))  # noqa
-        total_items = total_result.scalar() or 0
-        total_pages = (total_items + limit - 1) // limit if total_items > 0 else 0
-        if total_pages == 0:
-            return Pagination(items=[], total=0, current=1, back=None, next=None)
-        current = max(1, min(page, total_pages))
-        query = select(cls).order_by(cls.join_at.desc()).offset((current - 1) * limit).limit(limit)
-        result = await db.execute(query)
-        items = result.scalars().all()
-        back = current - 1 if current > 1 else None
-        next = current + 1 if current < total_pages else None
-        return Pagination(items=items, total=total_pages, current=current, back=back, next=next)
+    async def count(cls, db: AsyncSession) -> int:
+        if cls._count is None:
+            result = await db.execute(select(func.count()).select_from(cls))
+            cls._count = result.scalar() or 0
+        return cls._count
+
+    @classmethod
+    async def get_paginated(cls, db: AsyncSession, cursor: Optional[int] = None, limit: int = 20) -> Pagination:
+        return await paginate(
+            db,
+            select(cls),
+            order=cls.join_at,
+            id=cls.id,
+            cursor=cursor,
+            total_items=await cls.count(db),
+            limit=limit,
+        )
 
     @classmethod
     async def upsert(cls, db: AsyncSession, *, user: EioUser) -> Optional["User"]:
         dbuser = await cls.get_by_id(db, user.id)
         if dbuser:
-            dbuser.full_name = user.full_name
-            dbuser.username = user.username
-            dbuser.online_at = datetime.now()
+            if dbuser.full_name != user.full_name:
+                dbuser.full_name = user.full_name
+            if dbuser.username != user.username:
+                dbuser.username = user.username
         else:
             dbuser = cls(
                 id=user.id,
@@ -147,6 +161,7 @@ class User(Base):
                 full_name=user.full_name,
             )
             db.add(dbuser)
+            cls._count = None
         await db.flush()
         return dbuser
 
@@ -1,8 +1,20 @@
-from typing import Any, Callable, Dict, Awaitable
+from typing import Any, Callable, Dict, Awaitable, Optional
 from eiogram.middleware import BaseMiddleware
 from eiogram.types import Update
-from src.db import GetDB, User, UserMessage, Setting
-from src.config import logger
+from src.db import GetDB, User, UserMessage, Setting, UserTouches
+from src.config import TELEGRAM_ADMINS_ID, logger
+from src.utils.metrics import Metrics
+
+ADMINS = frozenset(TELEGRAM_ADMINS_ID)
+
+
+def authorize(user_id: Optional[int]) -> bool:
+    """Return whether the user may use the bot, counting and logging the update the caller is about to drop."""
+    if user_id in ADMINS:
+        return True
+    Metrics.incr("telegram.unauthorized")
+    logger.warning(f"User {user_id} try to access bot without permission.")
+    return False
 
 
 class Middleware(BaseMiddleware):
@@ -15,14 +27,15 @@ class Middleware(BaseMiddleware):
         update: Update,
         data: Dict[str, Any],
     ):
+        user = update.origin.from_user
+        # The webhook already drops other users before queueing; this only guards updates fed in any other way.
+        if not authorize(user.id if user else None):
+            return False
         async with GetDB() as db:
-            user = update.origin.from_user
             dbuser = await User.upsert(db, user=user)
+            UserTouches.touch(dbuser.id)
             if update.message:
                 await UserMessage.add(update.message)
-            if not dbuser.has_access:
-                logger.warning(f"User {dbuser.id} try to access bot without permission.")
-                return False
             setting = await Setting.get(db)
             data["setting"] = setting
             data["dbuser"] = dbuser
@@ -22,7 +22,7 @@ async def server_menu_handler(
     state: StateManager,
 ):
     await state.clear_state(db=db)
-    pagination = await Server.get_paginated(db, page=int(callback_data.page) if callback_data.page else 1)
+    pagination = await Server.get_paginated(db, cursor=int(callback_data.page) if callback_data.page else None)
     update = await callback_query.message.edit(
         text=DialogText.SERVERS_MENU,
         reply_markup=BotKB.servers_menu(pagination=pagination),
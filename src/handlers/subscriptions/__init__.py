@@ -1,11 +1,12 @@
 from eiogram import Router
-from . import create, info, menu, update
+from . import create, info, menu, search, update
 
 
 def setup_subscription_handlers(router: Router) -> None:
     router.include_router(create.router)
     router.include_router(info.router)
     router.include_router(menu.router)
+    router.include_router(search.router)
     router.include_router(update.router)
 
 
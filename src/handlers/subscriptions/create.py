@@ -4,7 +4,7 @@ from eiogram.filters import StateFilter, Text
 from eiogram.state import StateManager, State, StateGroup
 
 from src.keys import BotCB, BotKB, SectionType, ActionType
-from src.db import AsyncSession, Server, UserMessage, Subscription
+from src.db import AsyncSession, Server, UserMessage, Subscription, LoadProfile
 from src.lang import DialogText
 from src.xui import XUIManager
 
@@ -34,7 +34,7 @@ async def sub_create_handler(callback_query: CallbackQuery, db: AsyncSession, st
 
 @router.message(StateFilter(SubCreateForm.remark), Text())
 async def sub_remark_handler(message: Message, db: AsyncSession, state: StateManager):
-    if await Subscription.get_by_remark(db, message.text):
+    if await Subscription.get_by_remark(db, message.text, LoadProfile.SYNC):
         update = await message.answer(
             text=DialogText.SUBS_REMARK_EXISTS,
         )
@@ -4,7 +4,7 @@ from eiogram.filters import IgnoreStateFilter
 from eiogram.state import StateManager
 
 from src.keys import BotCB, BotKB, SectionType, ActionType
-from src.db import AsyncSession, Subscription, UserMessage
+from src.db import AsyncSession, Subscription, UserMessage, LoadProfile
 from src.lang import DialogText
 
 router = Router()
@@ -21,7 +21,7 @@ async def sub_info_handler(
     state: StateManager,
 ):
     await state.clear_state(db=db)
-    sub = await Subscription.get_by_id(db, int(callback_data.target))
+    sub = await Subscription.get_by_id(db, int(callback_data.target), LoadProfile.DETAIL)
     if not sub:
         return await callback_query.answer(DialogText.SUBS_NOT_FOUND, show_alert=True)
     update = await callback_query.message.edit(
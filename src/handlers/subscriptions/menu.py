@@ -4,7 +4,7 @@ from eiogram.filters import IgnoreStateFilter
 from eiogram.state import StateManager
 
 from src.keys import BotCB, BotKB, SectionType, ActionType
-from src.db import AsyncSession, Subscription, UserMessage
+from src.db import AsyncSession, Subscription, UserMessage, LoadProfile
 from src.lang import DialogText
 
 
@@ -22,7 +22,11 @@ async def sub_menu_handler(
     state: StateManager,
 ):
     await state.clear_state(db=db)
-    pagination = await Subscription.get_paginated(db, page=int(callback_data.page) if callback_data.page else 1)
+    pagination = await Subscription.get_paginated(
+        db,
+        cursor=int(callback_data.page) if callback_data.page else None,
+        profile=LoadProfile.LISTING,
+    )
     update = await callback_query.message.edit(
         text=DialogText.SUBS_MENU,
         reply_markup=BotKB.subs_menu(pagination=pagination),
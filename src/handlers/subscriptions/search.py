@@ -0,0 +1,37 @@
+from html import escape
+from eiogram import Router
+from eiogram.types import CallbackQuery, Message
+from eiogram.filters import StateFilter, Text
+from eiogram.state import StateManager, State, StateGroup
+
+from src.keys import BotCB, BotKB, SectionType, ActionType
+from src.db import AsyncSession, Subscription, UserMessage, LoadProfile
+from src.lang import DialogText
+
+router = Router()
+
+
+class SubSearchForm(StateGroup):
+    query = State()
+
+
+@router.callback_query(
+    BotCB.filter(section=SectionType.SUBS, action=ActionType.SEARCH),
+)
+async def sub_search_handler(callback_query: CallbackQuery, db: AsyncSession, state: StateManager):
+    await state.set_state(db=db, state=SubSearchForm.query)
+    return await callback_query.message.edit(text=DialogText.SUBS_ENTER_SEARCH, reply_markup=BotKB.subs_back())
+
+
+@router.message(StateFilter(SubSearchForm.query), Text())
+async def sub_search_query_handler(message: Message, db: AsyncSession, state: StateManager):
+    subs = await Subscription.search(db, message.text, profile=LoadProfile.LISTING)
+    if not subs:
+        update = await message.answer(text=DialogText.SUBS_NOT_FOUND)
+        return await UserMessage.add(update)
+    await state.clear_state(db=db)
+    update = await message.answer(
+        text=DialogText.SUBS_SEARCH_RESULTS.format(query=escape(message.text)),
+        reply_markup=BotKB.subs_search(subs),
+    )
+    return await UserMessage.clear(update)
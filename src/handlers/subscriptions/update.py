@@ -3,7 +3,7 @@ from eiogram.types import CallbackQuery, Message
 from eiogram.state import State, StateGroup, StateManager
 from eiogram.filters import Text, StateFilter
 
-from src.db import Server, AsyncSession, UserMessage, Subscription
+from src.db import Server, AsyncSession, UserMessage, Subscription, LoadProfile
 from src.keys import BotKB, BotCB, SectionType, ActionType, SubActionType
 from src.lang import DialogText
 from src.xui import XUIManager
@@ -24,7 +24,7 @@ async def sub_update_handler(
     db: AsyncSession,
     state: StateManager,
 ):
-    sub = await Subscription.get_by_id(db, int(callback_data.target))
+    sub = await Subscription.get_by_id(db, int(callback_data.target), LoadProfile.DETAIL)
     if not sub:
         return await callback_query.answer(DialogText.SUBS_NOT_FOUND, show_alert=True)
     kb = BotKB.subs_back(sub.id)
@@ -50,7 +50,7 @@ async def sub_update_handler(
 
 @router.message(StateFilter(SubUpdateForm.input), Text())
 async def input_handler(message: Message, db: AsyncSession, state_data: dict, state: StateManager):
-    sub = await Subscription.get_by_id(db, int(state_data["sub_id"]))
+    sub = await Subscription.get_by_id(db, int(state_data["sub_id"]), LoadProfile.SYNC)
     if not sub:
         update = await message.answer(DialogText.SUBS_NOT_FOUND, reply_markup=BotKB.subs_back())
         await state.clear_state(db=db)
@@ -59,7 +59,7 @@ async def input_handler(message: Message, db: AsyncSession, state_data: dict, st
     kb = BotKB.subs_back(target=sub.id)
     match state_data["sub_action"]:
         case SubActionType.REMARK:
-            if await Subscription.get_by_remark(db, message.text):
+            if await Subscription.get_by_remark(db, message.text, LoadProfile.SYNC):
                 update = await message.answer(
                     text=DialogText.SUBS_REMARK_EXISTS,
                 )
@@ -111,7 +111,7 @@ async def approval_handler(
 ):
     await callback_query.message.edit(text=DialogText.ACTIONS_PROCESSING)
     await state.clear_state(db=db)
-    sub = await Subscription.get_by_id(db, int(state_data["sub_id"]))
+    sub = await Subscription.get_by_id(db, int(state_data["sub_id"]), LoadProfile.SYNC)
     if not sub:
         update = await callback_query.message.answer(DialogText.SERVERS_NOT_FOUND, reply_markup=BotKB.subs_back())
         return await UserMessage.clear(update)
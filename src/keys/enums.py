@@ -19,6 +19,7 @@ class ActionType(StrEnum):
     CREATE = "cr"
     UPDATE = "up"
     LIST = "ls"
+    SEARCH = "sr"
 
 
 class SubActionType(StrEnum):
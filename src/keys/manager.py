@@ -34,6 +34,16 @@ class BotKB:
             callback_data=BotCB(section=section, action=ActionType.CREATE).pack(),
         )
 
+    @classmethod
+    def _search(
+        cls,
+        section: SectionType = SectionType.HOME,
+    ) -> InlineKeyboardButton:
+        return InlineKeyboardButton(
+            text=ButtonText.ACTIONS_SEARCH,
+            callback_data=BotCB(section=section, action=ActionType.SEARCH).pack(),
+        )
+
     @classmethod
     def _back_generate(
         cls,
@@ -51,6 +61,7 @@ class BotKB:
         section: SectionType,
         pagination: Optional[Pagination] = None,
         create: bool = True,
+        search: bool = False,
     ) -> InlineKeyboardMarkup:
         kb = InlineKeyboardBuilder()
         for remark, target in items.items():
@@ -72,8 +83,12 @@ class BotKB:
                 ),
                 size=2,
             )
+        actions = []
         if create:
-            kb.row(cls._create(section=section))
+            actions.append(cls._create(section=section))
+        if search:
+            actions.append(cls._search(section=section))
+        kb.row(*actions)
         kb.row(cls._back())
         return kb.as_markup()
 
@@ -110,13 +125,13 @@ class BotKB:
         buttons.append(
             InlineKeyboardButton(
                 text=ButtonText.PAGES_BACK if pagination.back else "     ",
-                callback_data=BotCB(section=section, action=action).pack() if pagination.back else "_",
+                callback_data=BotCB(section=section, action=action, page=pagination.back).pack() if pagination.back else "_",
             )
         )
         buttons.append(
             InlineKeyboardButton(
                 text=ButtonText.PAGES_NEXT if pagination.next else "     ",
-                callback_data=BotCB(section=section, action=action).pack() if pagination.next else "_",
+                callback_data=BotCB(section=section, action=action, page=pagination.next).pack() if pagination.next else "_",
             )
         )
         return buttons
@@ -191,6 +206,16 @@ class BotKB:
             items={item.kb_remark: item.id for item in pagination.items},
             section=SectionType.SUBS,
             pagination=pagination,
+            search=True,
+        )
+
+    @classmethod
+    def subs_search(cls, items: List[Subscription]) -> InlineKeyboardMarkup:
+        return cls._menu(
+            items={item.kb_remark: item.id for item in items},
+            section=SectionType.SUBS,
+            create=False,
+            search=True,
         )
 
     @classmethod
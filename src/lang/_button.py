@@ -7,6 +7,7 @@ class ButtonText(StrEnum):
     ACTIONS_CREATE = "➕ Create"
     ACTIONS_YES = "✔️ Yes"
     ACTIONS_NO = "✖️ No"
+    ACTIONS_SEARCH = "🔍 Search"
 
     ### pages
     PAGES_BACK = "⬅️"
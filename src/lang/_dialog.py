@@ -33,6 +33,8 @@ class DialogText(StrEnum):
     ### Subscriptions
     SUBS_MENU = "📦 <b>Subscription Management</b>\nSelect a subscription to manage or add a new one."
     SUBS_NOT_FOUND = "❌ No subscription found."
+    SUBS_ENTER_SEARCH = "🔍 <b>Search subscriptions:</b>\nSend part of a remark, owner name or access key."
+    SUBS_SEARCH_RESULTS = "🔍 <b>Search results for</b> <code>{query}</code>\nSelect a subscription to manage."
     SUBS_INFO = (
         "📦 <b>Subscription Information</b>\nYou can update or delete the subscription from here.\n"
         "➖➖➖➖➖\n"
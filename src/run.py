@@ -1,4 +1,8 @@
+import asyncio
+import signal
 from copy import deepcopy
+from enum import StrEnum
+import uvicorn
 from uvicorn import Config, Server
 from uvicorn.config import LOGGING_CONFIG
 from src.config import (
@@ -6,6 +10,8 @@ from src.config import (
     UVICORN_SSL_KEYFILE,
     UVICORN_HOST,
     UVICORN_PORT,
+    UVICORN_WORKERS,
+    ROLE,
     BOT,
     DP,
     TELEGRAM_WEBHOOK_HOST,
@@ -13,9 +19,12 @@ from src.config import (
     logger,
 )
 from src.api import API
-from src.utils.state import DatabaseStorage
+from src.utils.state import CachedStorage, get_storage
 from src.handlers import setup_handlers
 from src.tasks import TaskManager
+from src.xui import XUIRequest
+from src.db import CacheBus, SubscriptionTouches, UserTouches
+from src.api.routers.telegram import TelegramUpdates
 
 
 def get_log_config():
@@ -29,7 +38,24 @@ def get_log_config():
     return log_config
 
 
+class Role(StrEnum):
+    ALL = "all"
+    API = "api"
+    SCHEDULER = "scheduler"
+    BOT = "bot"
+
+
+def get_role() -> Role:
+    try:
+        return Role(ROLE)
+    except ValueError:
+        raise SystemExit(f"Unknown role {ROLE!r}, expected one of: {', '.join(Role)}")
+
+
 async def main():
+    if get_role() == Role.SCHEDULER:
+        return await run_scheduler()
+
     cfg = Config(
         app=API,
         host=UVICORN_HOST,
@@ -45,9 +71,46 @@ async def main():
     await server.serve()
 
 
-@API.on_event("startup")
-async def startup_event():
-    await TaskManager.start()
+async def run_scheduler():
+    """Run only the scheduler jobs, without an HTTP server, until the process is stopped."""
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stopped.set)
+        except NotImplementedError:
+            pass
+    await startup_event()
+    try:
+        await stopped.wait()
+    finally:
+        await shutdown_event()
+
+
+def run_workers(role: Role):
+    """Serve the API from several processes.
+
+    Every worker joins the scheduler election, so the shared jobs run in exactly one of them and move to another
+    when it dies. Only the api role may fork: the bot's webhook, per-chat worker pool and FSM cache must live in
+    exactly one process.
+    """
+    if role != Role.API:
+        raise SystemExit(
+            f"UVICORN_WORKERS={UVICORN_WORKERS} is only supported with the api role, "
+            "run the bot and the scheduler as their own single 'bot' and 'scheduler' processes"
+        )
+    uvicorn.run(
+        "src.run:API",
+        host=UVICORN_HOST,
+        port=UVICORN_PORT,
+        workers=UVICORN_WORKERS,
+        log_config=get_log_config(),
+        ssl_certfile=UVICORN_SSL_CERTFILE or None,
+        ssl_keyfile=UVICORN_SSL_KEYFILE or None,
+    )
+
+
+async def setup_bot():
     await BOT.set_webhook(
         url=f"{TELEGRAM_WEBHOOK_HOST}/api/telegram/webhook",
         secret_token=TELEGRAM_WEBHOOK_SECRET_KEY,
@@ -57,12 +120,37 @@ async def startup_event():
         ],
     )
     DP.include_router(setup_handlers())
-    DP.storage = DatabaseStorage()
+    DP.storage = get_storage()
+    if isinstance(DP.storage, CachedStorage):
+        DP.storage.start()
+    TelegramUpdates.start()
     username = (await BOT.get_me()).username
     logger.info(f"Bot [@{username}] started successfully")
 
 
+@API.on_event("startup")
+async def startup_event():
+    role = get_role()
+    CacheBus.start()
+    if role in (Role.ALL, Role.API):
+        SubscriptionTouches.start()
+    if role in (Role.ALL, Role.BOT):
+        UserTouches.start()
+    if role in (Role.ALL, Role.API, Role.SCHEDULER):
+        await TaskManager.start()
+    if role in (Role.ALL, Role.BOT):
+        await setup_bot()
+    logger.info(f"Started as {role} role")
+
+
 @API.on_event("shutdown")
 async def shutdown_event():
+    await TelegramUpdates.stop()
+    if isinstance(DP.storage, CachedStorage):
+        await DP.storage.stop()
     await TaskManager.stop()
-    logger.info("Bot stopped successfully")
+    await XUIRequest.close()
+    await SubscriptionTouches.stop()
+    await UserTouches.stop()
+    await CacheBus.stop()
+    logger.info(f"Stopped {get_role()} role")
@@ -1,3 +1,4 @@
 from .manager import TaskManager
+from .enforcer import Enforcer
 
-__all__ = ["TaskManager"]
+__all__ = ["TaskManager", "Enforcer"]
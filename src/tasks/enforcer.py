@@ -0,0 +1,142 @@
+import asyncio
+import heapq
+from time import time
+from typing import Dict, List, Optional, Set, Tuple
+from src.db import GetDB, Subscription, Server, LoadProfile, CacheBus, CacheEvent
+from src.xui import XUIManager
+from src.config import SUBS_CHECKER_CONCURRENCY, logger
+from src.utils.metrics import Metrics
+
+
+class SubscriptionEnforcer:
+    """Deactivate subscriptions on every panel as soon as they stop being available.
+
+    Upcoming expire timestamps sit in a min-heap that is loaded once and then kept current from
+    subscription change events, so the work between full reconciliations scales with the number
+    of deadlines reached instead of the number of subscriptions.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[int, int]] = []
+        self._deadlines: Dict[int, int] = {}
+        self._dirty: Set[int] = set()
+        self._reload = False
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._jobs: Set[asyncio.Task] = set()
+        self._semaphore = asyncio.Semaphore(SUBS_CHECKER_CONCURRENCY)
+
+    def _push(self, sub_id: int, expire: int) -> None:
+        self._deadlines[sub_id] = expire
+        heapq.heappush(self._heap, (expire, sub_id))
+
+    def _mark(self, id: Optional[int]) -> None:
+        if id is None:
+            self._reload = True
+        else:
+            self._dirty.add(id)
+        self._wake.set()
+
+    def on_change(self, id: Optional[int] = None, key: Optional[str] = None) -> None:
+        """Cache-bus handler; the bus only dispatches committed changes, so the deadline is re-read right away."""
+        if self._task is None:
+            return
+        self._mark(id)
+
+    async def _refresh(self) -> None:
+        if self._reload:
+            self._reload = False
+            self._dirty.clear()
+            async with GetDB() as db:
+                rows = await Subscription.get_expire_deadlines(db)
+            self._heap, self._deadlines = [], {}
+            for sub_id, expire in rows:
+                self._push(sub_id, expire)
+        elif self._dirty:
+            ids, self._dirty = self._dirty, set()
+            async with GetDB() as db:
+                rows = await Subscription.get_expire_deadlines(db, ids)
+            for sub_id in ids:
+                self._deadlines.pop(sub_id, None)
+            for sub_id, expire in rows:
+                self._push(sub_id, expire)
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._heap = [(expire, sub_id) for sub_id, expire in self._deadlines.items()]
+            heapq.heapify(self._heap)
+        Metrics.gauge("enforcement.deadlines", len(self._deadlines))
+
+    def _pop_due(self, now: float) -> List[Tuple[int, int]]:
+        # Same test as Subscription.expired, so a popped deadline is always expired on re-check.
+        due = []
+        while self._heap and int(now) > self._heap[0][0]:
+            expire, sub_id = heapq.heappop(self._heap)
+            if self._deadlines.get(sub_id) != expire:
+                continue
+            del self._deadlines[sub_id]
+            due.append((sub_id, expire))
+        return due
+
+    async def _run(self) -> None:
+        self._reload = True
+        while True:
+            self._wake.clear()
+            try:
+                await self._refresh()
+            except Exception as e:
+                logger.error(f"Loading subscription deadlines failed: {e}")
+                self._reload = True
+                await asyncio.sleep(5)
+                continue
+            for sub_id, expire in self._pop_due(time()):
+                self.enqueue(sub_id, "expire", since=expire)
+            timeout = self._heap[0][0] + 1 - time() if self._heap else None
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def enqueue(self, sub_id: int, reason: str, since: float) -> None:
+        """Deactivate one subscription on every panel in the background."""
+        job = asyncio.create_task(self._deactivate(sub_id, reason, since))
+        self._jobs.add(job)
+        job.add_done_callback(self._jobs.discard)
+
+    async def _deactivate(self, sub_id: int, reason: str, since: float) -> None:
+        try:
+            async with self._semaphore:
+                async with GetDB() as db:
+                    sub = await Subscription.get_by_id(db, sub_id, LoadProfile.SYNC)
+                    if not sub:
+                        return
+                    if sub.availabled:
+                        # Extended or re-enabled meanwhile: re-read its deadline instead of dropping it.
+                        self._mark(sub_id)
+                        return
+                    servers = await Server.get_all(db)
+                done = await XUIManager.deactivate(servers=servers, uuid=sub.server_key)
+        except Exception as e:
+            logger.error(f"Enforcing {reason} for subscription {sub_id} failed: {e}")
+            return
+        Metrics.incr(f"enforcement.{reason}")
+        Metrics.observe(f"enforcement.{reason}_latency", max(0.0, time() - since))
+        if done:
+            logger.info(f"Subscription '{sub.remark}' deactivated on {reason}")
+        else:
+            logger.warning(f"Subscription '{sub.remark}' was not deactivated on every server after {reason}")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for job in list(self._jobs):
+            job.cancel()
+        self._jobs.clear()
+        self._heap, self._deadlines, self._dirty = [], {}, set()
+
+
+Enforcer = SubscriptionEnforcer()
+CacheBus.subscribe(CacheEvent.SUBSCRIPTION, Enforcer.on_change)
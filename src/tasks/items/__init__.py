@@ -1,5 +1,6 @@
 from .access import access_generate
 from .message import remove_expire_messages
 from .subs import subs_checkers
+from .links import links_refresher
 
-__all__ = ["access_generate", "remove_expire_messages", "subs_checkers"]
+__all__ = ["access_generate", "remove_expire_messages", "subs_checkers", "links_refresher"]
@@ -0,0 +1,30 @@
+import asyncio
+from src.db import GetDB, Subscription, Server, LoadProfile
+from src.xui import XUIRequest, LinkSnapshotStore, LinkTemplateStore
+from src.config import LINK_REFRESH_INTERVAL, logger
+
+
+async def _build_template(server: Server) -> bool:
+    inbounds = await XUIRequest.get_inbounds(host=server.api_host, cookies=server.cookies)
+    if not inbounds:
+        return False
+    return await LinkTemplateStore.build(server, inbounds)
+
+
+async def links_refresher(snapshots: bool = True) -> None:
+    """Rebuild the local link templates and, when ``snapshots`` is set, refresh the per-sub snapshots."""
+    async with GetDB() as db:
+        servers = await Server.get_all(db, availabled=True)
+        subs = await Subscription.get_all(db, availabled=True, profile=LoadProfile.SYNC) if snapshots else []
+    built = await asyncio.gather(*[_build_template(server) for server in servers], return_exceptions=True)
+    untemplated = [server for server, ok in zip(servers, built) if ok is not True]
+    for server in untemplated:
+        LinkTemplateStore.drop(server.id)
+    if not snapshots:
+        logger.info(f"Link templates built for {len(servers) - len(untemplated)} servers")
+        return
+    await LinkSnapshotStore.refresh_all(servers=untemplated, subs=subs, window=LINK_REFRESH_INTERVAL * 0.8)
+    logger.info(
+        f"Link templates built for {len(servers) - len(untemplated)} servers, "
+        f"snapshots refreshed for {len(untemplated)} servers"
+    )
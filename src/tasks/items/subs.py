@@ -1,88 +1,140 @@
-from src.db import GetDB, Subscription, Server
+import asyncio
+from time import perf_counter, time
+from typing import Awaitable, Dict, List, Mapping
+from src.db import GetDB, Subscription, Server, LoadProfile
 from src.xui import XUIRequest, ClientRequest
-from src.config import logger
+from src.config import SUBS_CHECKER_CONCURRENCY, logger
+from ..enforcer import Enforcer
+from ..planner import ServerPlan, SyncAction, SyncActionType, UsageKey, plan_server
+
+
+async def _limited(semaphore: asyncio.Semaphore, action: Awaitable[bool], message: str) -> bool:
+    async with semaphore:
+        success = await action
+    if success:
+        logger.info(message)
+    return success
+
+
+def _apply(server: Server, inbound_id: int, action: SyncAction) -> tuple[Awaitable[bool], str]:
+    match action.type:
+        case SyncActionType.DELETE:
+            return (
+                XUIRequest.remove_client(
+                    host=server.api_host,
+                    cookies=server.cookies,
+                    inbound_id=inbound_id,
+                    client_id=action.server_key,
+                ),
+                f"Client for removed subscription '{action.remark}' deleted successfully on server {server.id}",
+            )
+        case SyncActionType.DISABLE:
+            return (
+                XUIRequest.deactivate_client(
+                    host=server.api_host,
+                    cookies=server.cookies,
+                    inbound_id=inbound_id,
+                    client_id=action.server_key,
+                ),
+                f"Client for subscription '{action.remark}' deactivated successfully on server {server.id}",
+            )
+        case SyncActionType.ENABLE:
+            return (
+                XUIRequest.activate_client(
+                    host=server.api_host,
+                    cookies=server.cookies,
+                    inbound_id=inbound_id,
+                    client_id=action.server_key,
+                ),
+                f"Client for subscription '{action.remark}' re-activated successfully on server {server.id}",
+            )
+
+
+async def _create_batch(semaphore: asyncio.Semaphore, server: Server, inbound_id: int, actions: List[SyncAction]) -> None:
+    remarks = {action.server_key: action.remark for action in actions}
+    logger.info(f"Creating {len(actions)} clients on server {server.id} inbound {inbound_id}")
+    async with semaphore:
+        created = await XUIRequest.create_clients(
+            host=server.api_host,
+            cookies=server.cookies,
+            inbound_id=inbound_id,
+            clients=[ClientRequest(id=action.server_key) for action in actions],
+        )
+    for server_key in created:
+        logger.info(f"Client for subscription '{remarks[server_key]}' created successfully on server {server.id}")
+
+
+async def execute_plan(plan: ServerPlan) -> None:
+    """Apply the panel-side changes of a plan, bounded per server."""
+    changes = plan.changes
+    if not changes:
+        return
+    semaphore = asyncio.Semaphore(SUBS_CHECKER_CONCURRENCY)
+    creates: Dict[int, List[SyncAction]] = {}
+    tasks = []
+    for inbound_id, action in changes:
+        if action.type == SyncActionType.CREATE:
+            creates.setdefault(inbound_id, []).append(action)
+            continue
+        tasks.append(_limited(semaphore, *_apply(plan.server, inbound_id, action)))
+    tasks.extend(_create_batch(semaphore, plan.server, inbound_id, actions) for inbound_id, actions in creates.items())
+    await asyncio.gather(*tasks)
+
+
+async def _check_server(
+    server: Server,
+    subs: List[Subscription],
+    usages: Mapping[UsageKey, int],
+    plans: List[ServerPlan],
+) -> None:
+    started = perf_counter()
+    inbounds = await XUIRequest.get_inbounds(host=server.api_host, cookies=server.cookies)
+    if not inbounds:
+        logger.warning(f"No inbounds found for server {server.id}")
+        return
+    plan = plan_server(server, inbounds, subs, usages)
+    plans.append(plan)
+    await execute_plan(plan)
+    logger.debug(f"Server {server.id} checked with {len(plan.changes)} actions in {perf_counter() - started:.2f}s")
 
 
 async def subs_checkers() -> None:
+    started = perf_counter()
     async with GetDB() as db:
-        subs = await Subscription.get_all(db, removed=None)
+        subs = await Subscription.get_all(db, removed=None, profile=LoadProfile.SYNC)
         if not subs:
             return
         servers = await Server.get_all(db)
         if not servers:
             logger.info("No servers found")
             return
-        for server in servers:
-            inbounds = await XUIRequest.get_inbounds(host=server.api_host, cookies=server.cookies)
-            if not inbounds:
-                logger.warning(f"No inbounds found for server {server.id}")
-                continue
-            for inbound in inbounds:
-                clients = {client.subId: client for client in inbound.clientStats}
-                for sub in subs:
-                    client = clients.get(sub.server_key, None)
-                    if not client:
-                        if not sub.availabled or not server.availabled:
-                            continue
-                        logger.info(f"Creating client for subscription '{sub.remark}' on server {server.id}")
-                        success = await XUIRequest.create_client(
-                            host=server.api_host,
-                            cookies=server.cookies,
-                            inbound_id=inbound.id,
-                            clients=[ClientRequest(id=sub.server_key)],
-                        )
-                        if success:
-                            logger.info(f"Client for subscription '{sub.remark}' created successfully on server {server.id}")
-                        continue
-                    await Subscription.upsert_usage(
-                        db, sub_id=sub.id, server_id=server.id, inbound_id=inbound.id, client_id=client.id, usage=client.allTime
-                    )
-                    if client and sub.removed:
-                        success = await XUIRequest.remove_client(
-                            host=server.api_host,
-                            cookies=server.cookies,
-                            inbound_id=inbound.id,
-                            client_id=client.subId,
-                        )
-                        if success:
-                            logger.info(
-                                f"Client for removed subscription '{sub.remark}' deleted successfully on server {server.id}"
-                            )
-                        continue
-                    if not server.enabled:
-                        success = await XUIRequest.deactivate_client(
-                            host=server.api_host,
-                            cookies=server.cookies,
-                            inbound_id=inbound.id,
-                            client_id=client.subId,
-                        )
-                        if success:
-                            logger.info(
-                                f"Client for subscription '{sub.remark}' deactivated successfully on server {server.id}"
-                            )
-                        continue
-
-                    if client.enable and not sub.availabled:
-                        success = await XUIRequest.deactivate_client(
-                            host=server.api_host,
-                            cookies=server.cookies,
-                            inbound_id=inbound.id,
-                            client_id=client.subId,
-                        )
-                        if success:
-                            logger.info(
-                                f"Client for subscription '{sub.remark}' deactivated successfully on server {server.id}"
-                            )
-                        continue
-                    if not client.enable and sub.availabled:
-                        success = await XUIRequest.activate_client(
-                            host=server.api_host,
-                            cookies=server.cookies,
-                            inbound_id=inbound.id,
-                            client_id=client.subId,
-                        )
-                        if success:
-                            logger.info(
-                                f"Client for subscription '{sub.remark}' re-activated successfully on server {server.id}"
-                            )
-                        continue
+        usages = await Subscription.get_usage_map(db)
+        available = {sub.id for sub in subs if sub.availabled}
+        plans: List[ServerPlan] = []
+        results = await asyncio.gather(
+            *[_check_server(server, subs, usages, plans) for server in servers],
+            return_exceptions=True,
+        )
+        observed = time()
+        for server, result in zip(servers, results):
+            if isinstance(result, Exception):
+                logger.error(f"Subscription check failed for server {server.id}: {result}")
+        changed, limited = await Subscription.upsert_usages(
+            db,
+            [
+                {
+                    "sub_id": action.sub_id,
+                    "server_id": plan.server.id,
+                    "inbound_id": inbound_id,
+                    "client_id": action.client_id,
+                    "usage": action.usage,
+                }
+                for plan in plans
+                for inbound_id, action in plan.usages
+            ],
+        )
+        logger.debug(f"Subscription usages updated: {changed} rows changed")
+    # Enqueue after the commit above so the enforcer's own re-check sees the new totals.
+    for sub_id in available.intersection(limited):
+        Enforcer.enqueue(sub_id, "limit", since=observed)
+    logger.info(f"Subscription check finished for {len(servers)} servers in {perf_counter() - started:.2f}s")
@@ -1,41 +1,74 @@
+from functools import partial
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
-from src.config import logger
-from .items import access_generate, remove_expire_messages, subs_checkers
+from src.config import LINK_REFRESH_INTERVAL, SCHEDULER_LOCK_KEY, SUBS_CHECKER_INTERVAL, logger
+from src.db import LeaderElection
+from src.xui import LinkSnapshotStore
+from .items import access_generate, remove_expire_messages, subs_checkers, links_refresher
+from .enforcer import Enforcer
 
 
 class SimpleScheduler:
+    LEADER_JOBS = ("remove_expire_messages", "access_generate", "subs_checkers")
+
     def __init__(self):
         self.scheduler = AsyncIOScheduler()
+        self.election = LeaderElection("scheduler", SCHEDULER_LOCK_KEY, self.lead, self.follow)
 
     async def start(self):
-        """Start the scheduler and add the job"""
+        """Start the scheduler and join the leader election"""
+        await LinkSnapshotStore.load()
+        self._add_links_job(snapshots=False)
+        self.scheduler.start()
+        self.election.start()
+
+    async def stop(self):
+        """Stop the scheduler"""
+        await self.election.stop()
+        if self.scheduler and self.scheduler.running:
+            self.scheduler.shutdown()
+
+    async def lead(self):
+        """Run the shared jobs; only the elected process does this"""
         await access_generate()
         self.scheduler.add_job(
             self._wrap_coroutine(remove_expire_messages),
             trigger=CronTrigger(minute=0),
             id="remove_expire_messages",
-            replace_existing=False,
+            replace_existing=True,
         )
         self.scheduler.add_job(
             self._wrap_coroutine(access_generate),
             trigger=IntervalTrigger(hours=8),
             id="access_generate",
-            replace_existing=False,
+            replace_existing=True,
         )
         self.scheduler.add_job(
             self._wrap_coroutine(subs_checkers),
-            trigger=IntervalTrigger(seconds=100),
+            trigger=IntervalTrigger(seconds=SUBS_CHECKER_INTERVAL),
             id="subs_checkers",
-            replace_existing=False,
+            replace_existing=True,
         )
-        self.scheduler.start()
+        Enforcer.start()
+        self._add_links_job(snapshots=True)
 
-    async def stop(self):
-        """Stop the scheduler"""
-        if self.scheduler and self.scheduler.running:
-            self.scheduler.shutdown()
+    async def follow(self):
+        """Drop the shared jobs and keep only the local link templates warm"""
+        await Enforcer.stop()
+        for job_id in self.LEADER_JOBS:
+            if self.scheduler.get_job(job_id):
+                self.scheduler.remove_job(job_id)
+        self._add_links_job(snapshots=False)
+        await LinkSnapshotStore.save()
+
+    def _add_links_job(self, snapshots: bool):
+        self.scheduler.add_job(
+            self._wrap_coroutine(partial(links_refresher, snapshots=snapshots)),
+            trigger=IntervalTrigger(seconds=LINK_REFRESH_INTERVAL),
+            id="links_refresher",
+            replace_existing=True,
+        )
 
     def _wrap_coroutine(self, coro):
         """Wrapper async"""
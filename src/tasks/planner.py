@@ -0,0 +1,82 @@
+from enum import StrEnum
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Tuple
+from src.db import Server, Subscription
+from src.xui import Inbound
+
+UsageKey = Tuple[int, int, int, int]
+
+
+class SyncActionType(StrEnum):
+    CREATE = "create"
+    ENABLE = "enable"
+    DISABLE = "disable"
+    DELETE = "delete"
+    USAGE = "usage"
+
+
+@dataclass
+class SyncAction:
+    type: SyncActionType
+    sub_id: int
+    server_key: str
+    remark: str
+    client_id: Optional[int] = None
+    usage: int = 0
+
+
+@dataclass
+class ServerPlan:
+    server: Server
+    inbounds: Dict[int, List[SyncAction]] = field(default_factory=dict)
+
+    @property
+    def changes(self) -> List[Tuple[int, SyncAction]]:
+        return [
+            (inbound_id, action)
+            for inbound_id, actions in self.inbounds.items()
+            for action in actions
+            if action.type != SyncActionType.USAGE
+        ]
+
+    @property
+    def usages(self) -> List[Tuple[int, SyncAction]]:
+        return [
+            (inbound_id, action)
+            for inbound_id, actions in self.inbounds.items()
+            for action in actions
+            if action.type == SyncActionType.USAGE
+        ]
+
+
+def plan_server(
+    server: Server,
+    inbounds: List[Inbound],
+    subs: List[Subscription],
+    usages: Optional[Mapping[UsageKey, int]] = None,
+) -> ServerPlan:
+    """Diff the subscriptions against one panel's inbounds without doing any I/O."""
+    usages = usages or {}
+    plan = ServerPlan(server=server)
+    for inbound in inbounds:
+        clients = {client.subId: client for client in inbound.clientStats}
+        actions = []
+        for sub in subs:
+            client = clients.get(sub.server_key, None)
+            if not client:
+                if sub.availabled and server.availabled:
+                    actions.append(SyncAction(SyncActionType.CREATE, sub.id, sub.server_key, sub.remark))
+                continue
+            known = usages.get((sub.id, server.id, inbound.id, client.id))
+            if (known is None and client.allTime > 0) or (known is not None and known != client.allTime):
+                actions.append(SyncAction(SyncActionType.USAGE, sub.id, sub.server_key, sub.remark, client.id, client.allTime))
+            if sub.removed:
+                actions.append(SyncAction(SyncActionType.DELETE, sub.id, client.subId, sub.remark, client.id))
+            elif not server.enabled or not sub.availabled:
+                if client.enable:
+                    actions.append(SyncAction(SyncActionType.DISABLE, sub.id, client.subId, sub.remark, client.id))
+            elif not client.enable:
+                actions.append(SyncAction(SyncActionType.ENABLE, sub.id, client.subId, sub.remark, client.id))
+        if actions:
+            plan.inbounds[inbound.id] = actions
+    return plan
@@ -0,0 +1,59 @@
+from time import monotonic
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+from src.config import GUARD_CACHE_TTL, GUARD_CACHE_SIZE
+
+
+class TTLCache:
+    """Small in-process LRU cache whose entries expire after ``ttl`` seconds and can be evicted by tag."""
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._items: OrderedDict[Hashable, Tuple[float, Any, Optional[Hashable]]] = OrderedDict()
+        self._tags: Dict[Hashable, Set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        item = self._items.get(key)
+        if item is None:
+            return None
+        expires_at, value, _ = item
+        if expires_at < monotonic():
+            self.invalidate(key)
+            return None
+        self._items.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, tag: Optional[Hashable] = None) -> None:
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        self.invalidate(key)
+        self._items[key] = (monotonic() + self.ttl, value, tag)
+        if tag is not None:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._items) > self.maxsize:
+            self.invalidate(next(iter(self._items)))
+
+    def invalidate(self, key: Hashable) -> None:
+        item = self._items.pop(key, None)
+        if item is None or item[2] is None:
+            return
+        keys = self._tags.get(item[2])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                self._tags.pop(item[2], None)
+
+    def invalidate_tag(self, tag: Hashable) -> None:
+        for key in list(self._tags.pop(tag, ())):
+            self._items.pop(key, None)
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._tags.clear()
+
+
+GuardCache = TTLCache(ttl=GUARD_CACHE_TTL, maxsize=GUARD_CACHE_SIZE)
@@ -0,0 +1,70 @@
+import asyncio
+from time import monotonic
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+from src.config import logger
+from .metrics import Metrics
+
+
+class KeyedWorkerPool:
+    """Run items on a fixed number of workers with bounded queues.
+
+    Items with the same key always land on the same worker, so they are handled in arrival order.
+    """
+
+    def __init__(self, name: str, handler: Callable[[Any], Awaitable[Any]], workers: int, maxsize: int):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.maxsize = max(1, maxsize // self.workers)
+        self._queues: List[asyncio.Queue[Tuple[float, Any]]] = []
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def depth(self) -> int:
+        return sum(queue.qsize() for queue in self._queues)
+
+    def submit(self, key: int, item: Any) -> bool:
+        """Queue an item without waiting; return False when its worker is already full."""
+        if not self._queues:
+            return False
+        try:
+            self._queues[hash(key) % self.workers].put_nowait((monotonic(), item))
+        except asyncio.QueueFull:
+            Metrics.incr(f"{self.name}.dropped")
+            return False
+        Metrics.gauge(f"{self.name}.queue_depth", self.depth)
+        return True
+
+    async def _work(self, queue: "asyncio.Queue[Tuple[float, Any]]") -> None:
+        while True:
+            queued_at, item = await queue.get()
+            started_at = monotonic()
+            Metrics.observe(f"{self.name}.queue_wait", started_at - queued_at)
+            try:
+                await self.handler(item)
+            except Exception as e:
+                Metrics.incr(f"{self.name}.errors")
+                logger.error(f"{self.name.title()} handler failed: {e}")
+            finally:
+                queue.task_done()
+                Metrics.observe(f"{self.name}.handler_latency", monotonic() - started_at)
+                Metrics.gauge(f"{self.name}.queue_depth", self.depth)
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._queues = [asyncio.Queue(maxsize=self.maxsize) for _ in range(self.workers)]
+        self._tasks = [asyncio.create_task(self._work(queue)) for queue in self._queues]
+
+    async def stop(self, timeout: Optional[float] = 10) -> None:
+        """Let the workers finish what is queued, up to ``timeout`` seconds, then cancel them."""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(asyncio.gather(*[queue.join() for queue in self._queues]), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{self.name.title()} stopped with {self.depth} items still queued")
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        self._queues = []
@@ -0,0 +1,35 @@
+from typing import Dict, Union
+
+Number = Union[int, float]
+
+
+class MetricsRegistry:
+    """Process-local counters, gauges and timings, readable as one snapshot."""
+
+    def __init__(self):
+        self._counters: Dict[str, Number] = {}
+        self._gauges: Dict[str, Number] = {}
+        self._timings: Dict[str, Dict[str, Number]] = {}
+
+    def incr(self, name: str, value: Number = 1) -> None:
+        self._counters[name] = self._counters.get(name, 0) + value
+
+    def gauge(self, name: str, value: Number) -> None:
+        self._gauges[name] = value
+
+    def observe(self, name: str, value: Number) -> None:
+        timing = self._timings.setdefault(name, {"count": 0, "sum": 0.0, "max": 0.0, "last": 0.0})
+        timing["count"] += 1
+        timing["sum"] += value
+        timing["max"] = max(timing["max"], value)
+        timing["last"] = value
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {
+            "counters": dict(self._counters),
+            "gauges": dict(self._gauges),
+            "timings": {name: dict(timing) for name, timing in self._timings.items()},
+        }
+
+
+Metrics = MetricsRegistry()
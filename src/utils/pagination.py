@@ -1,11 +1,56 @@
-from typing import List, Any
+from typing import List, Any, Optional
 from dataclasses import dataclass
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
 
 
 @dataclass
 class Pagination:
+    """One page of a keyset listing; ``back`` and ``next`` are cursors for the neighbouring pages."""
+
     items: List[Any]
     total: int
-    current: int
     back: int | None
     next: int | None
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    order: InstrumentedAttribute,
+    id: InstrumentedAttribute,
+    cursor: Optional[int],
+    total_items: int,
+    limit: int = 20,
+) -> Pagination:
+    """Keyset-paginate ``query`` newest first over (``order``, ``id``).
+
+    A positive cursor is the id of the last row already shown and loads the older page after it,
+    a negative cursor is the negated id of the first row shown and loads the newer page before it.
+    """
+    total = (total_items + limit - 1) // limit
+    if cursor:
+        anchor = select(order).where(id == abs(cursor)).correlate(None).scalar_subquery()
+        if cursor > 0:
+            page = query.where(tuple_(order, id) < tuple_(anchor, cursor)).order_by(order.desc(), id.desc())
+        else:
+            page = query.where(tuple_(order, id) > tuple_(anchor, -cursor)).order_by(order.asc(), id.asc())
+    else:
+        page = query.order_by(order.desc(), id.desc())
+
+    result = await db.execute(page.limit(limit + 1))
+    items = list(result.scalars().all())
+    more = len(items) > limit
+    items = items[:limit]
+    if not items:
+        if cursor:
+            return await paginate(db, query, order, id, None, total_items, limit)
+        return Pagination(items=[], total=total, back=None, next=None)
+
+    first, last = getattr(items[0], id.key), getattr(items[-1], id.key)
+    if cursor and cursor < 0:
+        items.reverse()
+        first, last = last, first
+        return Pagination(items=items, total=total, back=-first if more else None, next=last)
+    return Pagination(items=items, total=total, back=-first if cursor else None, next=last if more else None)
@@ -1,8 +1,13 @@
+import asyncio
+from collections import OrderedDict
 from typing import Any, Dict, Optional, Union
 from eiogram.state.storage import BaseStorage
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.db import UserState, GetDB
+from src.config import FSM_STORAGE, FSM_CACHE_SIZE, FSM_FLUSH_INTERVAL, logger
+from .metrics import Metrics
 
 
 class DatabaseStorage(BaseStorage):
@@ -109,3 +114,136 @@ class DatabaseStorage(BaseStorage):
         else:
             async with GetDB() as db:
                 await self.clear_all(key, db)
+
+
+class CachedStorage(BaseStorage):
+    """LRU-cached FSM storage: reads come from memory and writes reach ``user_states`` in batches.
+
+    The cache is process-local, so only use it when a single process handles the bot updates.
+    """
+
+    def __init__(self, maxsize: int = FSM_CACHE_SIZE, interval: float = FSM_FLUSH_INTERVAL):
+        self.maxsize = maxsize
+        self.interval = interval
+        self._items: OrderedDict[int, Dict[str, Any]] = OrderedDict()
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        # The batch being written; still the newest state of its keys until the write commits.
+        self._flushing: Dict[int, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _remember(self, key: int, item: Dict[str, Any]) -> None:
+        self._items[key] = item
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    async def _load(self, key: Union[int, str], db: Optional[AsyncSession] = None) -> Dict[str, Any]:
+        key = int(key)
+        item = self._pending.get(key) or self._flushing.get(key) or self._items.get(key)
+        if item is not None:
+            self._remember(key, item)
+            return item
+        Metrics.incr("fsm.misses")
+        if db:
+            user = await db.get(UserState, key)
+        else:
+            async with GetDB() as db:
+                user = await db.get(UserState, key)
+        item = {"state": user.state, "data": dict(user.data or {})} if user else {"state": None, "data": {}}
+        self._remember(key, item)
+        return item
+
+    def _write(self, key: Union[int, str], state: Optional[str], data: Dict[str, Any]) -> None:
+        key = int(key)
+        item = {"state": state, "data": data}
+        self._remember(key, item)
+        self._pending[key] = item
+        Metrics.gauge("fsm.pending", len(self._pending))
+
+    async def get_state(self, key: Union[int, str], db: Optional[AsyncSession] = None) -> Optional[str]:
+        return (await self._load(key, db))["state"]
+
+    async def get_context(self, key: Union[int, str], db: Optional[AsyncSession] = None) -> Dict[str, Any]:
+        item = await self._load(key, db)
+        return {"state": item["state"], "data": dict(item["data"])}
+
+    async def get_data(self, key: Union[int, str], db: Optional[AsyncSession] = None) -> Dict[str, Any]:
+        return dict((await self._load(key, db))["data"])
+
+    async def upsert_context(
+        self,
+        key: Union[int, str],
+        state: Optional[str] = None,
+        db: Optional[AsyncSession] = None,
+        **data: Any,
+    ) -> None:
+        item = await self._load(key, db)
+        self._write(key, state, {**item["data"], **data})
+
+    async def set_state(self, key: Union[int, str], state: Optional[str], db: Optional[AsyncSession] = None) -> None:
+        item = await self._load(key, db)
+        self._write(key, state, item["data"])
+
+    async def upsert_data(self, key: Union[int, str], db: Optional[AsyncSession] = None, **data: Any) -> None:
+        item = await self._load(key, db)
+        self._write(key, item["state"], {**item["data"], **data})
+
+    async def clear_state(self, key: Union[int, str], db: Optional[AsyncSession] = None) -> None:
+        item = await self._load(key, db)
+        self._write(key, None, item["data"])
+
+    async def clear_data(self, key: Union[int, str], db: Optional[AsyncSession] = None) -> None:
+        item = await self._load(key, db)
+        self._write(key, item["state"], {})
+
+    async def clear_all(self, key: Union[int, str], db: Optional[AsyncSession] = None) -> None:
+        self._write(key, None, {})
+
+    async def flush(self) -> int:
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        self._flushing = pending
+        rows = [{"id": key, "state": item["state"], "data": item["data"]} for key, item in pending.items()]
+        stmt = insert(UserState).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserState.id],
+            set_={"state": stmt.excluded.state, "data": stmt.excluded.data},
+        )
+        written = False
+        try:
+            async with GetDB() as db:
+                await db.execute(stmt)
+            written = True
+        except Exception as e:
+            logger.error(f"Flushing FSM states failed: {e}")
+            return 0
+        finally:
+            if not written:
+                for key, item in pending.items():
+                    self._pending.setdefault(key, item)
+            self._flushing = {}
+        Metrics.gauge("fsm.pending", len(self._pending))
+        Metrics.observe("fsm.flush_size", len(rows))
+        return len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+
+def get_storage() -> BaseStorage:
+    if FSM_STORAGE == "memory":
+        return CachedStorage()
+    return DatabaseStorage()
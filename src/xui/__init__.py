@@ -1,5 +1,15 @@
 from .request import XUIRequest
 from .types import ClientRequest, ClientStats, Inbound
+from .snapshots import LinkSnapshotStore
+from .templates import LinkTemplateStore
 from .manager import XUIManager
 
-__all__ = ["XUIRequest", "ClientRequest", "ClientStats", "Inbound", "XUIManager"]
+__all__ = [
+    "XUIRequest",
+    "ClientRequest",
+    "ClientStats",
+    "Inbound",
+    "LinkSnapshotStore",
+    "LinkTemplateStore",
+    "XUIManager",
+]
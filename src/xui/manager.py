@@ -3,11 +3,14 @@ import base64
 import random
 import json
 import urllib
+from typing import Optional
 from v2share import V2Data
 from src.db import Server, Subscription, Setting
-from src.config import logger
+from src.config import XUI_LINKS_TIMEOUT, XUI_LINKS_DEADLINE, logger
 from .request import XUIRequest
 from .types import ClientRequest, Inbound
+from .snapshots import LinkSnapshotStore
+from .templates import LinkTemplateStore
 
 
 class XUIManager:
@@ -24,6 +27,10 @@ class XUIManager:
 
     @classmethod
     async def create(cls, servers: list[Server], uuid: str) -> bool:
+        return await cls.create_bulk(servers=servers, uuids=[uuid])
+
+    @classmethod
+    async def create_bulk(cls, servers: list[Server], uuids: list[str]) -> bool:
         inbounds_per_server = await asyncio.gather(*[cls.get_inbounds(s) for s in servers])
 
         tasks = []
@@ -33,15 +40,17 @@ class XUIManager:
             if not inbounds:
                 continue
             for inbound in inbounds:
-                if cls._find_client(inbound, uuid):
+                existing = {client.subId for client in inbound.clientStats}
+                missing = [ClientRequest(id=uuid) for uuid in uuids if uuid not in existing]
+                if not missing:
                     continue
-                planned += 1
+                planned += len(missing)
                 tasks.append(
-                    XUIRequest.create_client(
+                    XUIRequest.create_clients(
                         host=server.api_host,
                         cookies=server.cookies,
                         inbound_id=inbound.id,
-                        clients=[ClientRequest(id=uuid)],
+                        clients=missing,
                     )
                 )
 
@@ -49,7 +58,7 @@ class XUIManager:
             return True
 
         results = await asyncio.gather(*tasks)
-        success_created = sum(1 for r in results if r)
+        success_created = sum(len(r) for r in results)
 
         return success_created == planned
 
@@ -184,6 +193,50 @@ class XUIManager:
 
         return success_revoked == planned
 
+    @classmethod
+    async def _fetch_server_links(cls, server: Server, server_key: str) -> Optional[list[str]]:
+        try:
+            links = await asyncio.wait_for(
+                XUIRequest.get_links(f"{server.sub_host}/{server_key}"),
+                timeout=XUI_LINKS_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Fetching links from server {server.id} timed out")
+            return None
+        if links is not None:
+            LinkSnapshotStore.put(server.id, server_key, links)
+        return links
+
+    @classmethod
+    async def fetch_links(cls, servers: list[Server], server_key: str) -> list[str]:
+        """Render templates and fresh snapshots locally and fetch the rest concurrently, falling back to stale snapshots."""
+        rendered = {server.id: LinkTemplateStore.render(server.id, server_key) for server in servers}
+        snapshots = {server.id: LinkSnapshotStore.get(server.id, server_key) for server in servers}
+        tasks = {
+            server.id: asyncio.create_task(cls._fetch_server_links(server, server_key))
+            for server in servers
+            if rendered[server.id] is None and (not snapshots[server.id] or not snapshots[server.id].fresh)
+        }
+        done = set()
+        if tasks:
+            done, pending = await asyncio.wait(tasks.values(), timeout=XUI_LINKS_DEADLINE)
+            for task in pending:
+                task.cancel()
+
+        links = []
+        for server in servers:
+            if rendered[server.id] is not None:
+                links.extend(rendered[server.id])
+                continue
+            task = tasks.get(server.id)
+            result = task.result() if task in done else None
+            if result is None and snapshots[server.id] and snapshots[server.id].servable:
+                if task:
+                    logger.info(f"Serving last known links of server {server.id}")
+                result = snapshots[server.id].links
+            links.extend(result or [])
+        return links
+
     @classmethod
     async def get_links(cls, servers: list[Server], sub: Subscription, setting: Setting) -> list[str]:
         links = []
@@ -198,8 +251,7 @@ class XUIManager:
                 logger.error(f"Error formatting information: {e}")
 
             if servers:
-                for server in servers:
-                    links.extend(await XUIRequest.get_links(f"{server.sub_host}/{sub.server_key}"))
+                links.extend(await cls.fetch_links(servers=servers, server_key=sub.server_key))
         else:
             try:
                 links.extend(
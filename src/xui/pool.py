@@ -0,0 +1,112 @@
+import asyncio
+from importlib.util import find_spec
+from time import monotonic
+from typing import ClassVar, Dict, Optional, Tuple
+from httpx import AsyncClient, Limits, Timeout, URL
+from src.config import (
+    XUI_HTTP2,
+    XUI_MAX_CONNECTIONS,
+    XUI_MAX_KEEPALIVE_CONNECTIONS,
+    XUI_KEEPALIVE_EXPIRY,
+    XUI_CLIENT_IDLE_TTL,
+    XUI_TIMEOUT,
+    logger,
+)
+
+
+class XUIClientPool:
+    """Long-lived httpx clients, one per panel origin and cookie set."""
+
+    _clients: ClassVar[Dict[Tuple[str, str, Tuple], AsyncClient]] = {}
+    _used: ClassVar[Dict[Tuple[str, str, Tuple], float]] = {}
+    _swept_at: ClassVar[float] = 0.0
+    _lock: ClassVar[Optional[asyncio.Lock]] = None
+    _retiring: ClassVar[Dict[asyncio.Task, AsyncClient]] = {}
+    _http2: ClassVar[Optional[bool]] = None
+
+    @classmethod
+    def _origin(cls, url: str) -> str:
+        parsed = URL(url)
+        return f"{parsed.scheme}://{parsed.netloc.decode()}"
+
+    @classmethod
+    def _fingerprint(cls, cookies: Optional[dict]) -> Tuple:
+        return tuple(sorted((cookies or {}).items()))
+
+    @classmethod
+    def _use_http2(cls) -> bool:
+        if cls._http2 is None:
+            cls._http2 = XUI_HTTP2 and find_spec("h2") is not None
+            if XUI_HTTP2 and not cls._http2:
+                logger.warning("XUI_HTTP2 is enabled but the 'h2' package is not installed, falling back to HTTP/1.1")
+        return cls._http2
+
+    @classmethod
+    def _build(cls, cookies: Optional[dict]) -> AsyncClient:
+        return AsyncClient(
+            cookies=cookies,
+            http2=cls._use_http2(),
+            timeout=Timeout(XUI_TIMEOUT),
+            limits=Limits(
+                max_connections=XUI_MAX_CONNECTIONS,
+                max_keepalive_connections=XUI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=XUI_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+    @classmethod
+    async def get(cls, url: str, cookies: Optional[dict] = None, login: bool = False) -> AsyncClient:
+        """Return the shared client for the url's origin and cookie set, creating it on first use.
+
+        ``login`` selects a separate per-origin client whose cookie jar only login requests touch.
+        Clients left unused for XUI_CLIENT_IDLE_TTL, such as those of a replaced session, are retired.
+        """
+        if cls._lock is None:
+            cls._lock = asyncio.Lock()
+        scope = "login" if login else "auth" if cookies else "anon"
+        key = (cls._origin(url), scope, cls._fingerprint(cookies))
+        now = monotonic()
+        if now - cls._swept_at > XUI_CLIENT_IDLE_TTL / 2:
+            cls._sweep(now)
+        client = cls._clients.get(key)
+        if client is None or client.is_closed:
+            async with cls._lock:
+                client = cls._clients.get(key)
+                if client is None or client.is_closed:
+                    client = cls._build(cookies)
+                    cls._clients[key] = client
+        cls._used[key] = now
+        return client
+
+    @classmethod
+    def _sweep(cls, now: float) -> None:
+        cls._swept_at = now
+        for key in [key for key, used in cls._used.items() if now - used > XUI_CLIENT_IDLE_TTL]:
+            cls._used.pop(key, None)
+            client = cls._clients.pop(key, None)
+            if client is not None:
+                task = asyncio.create_task(cls._retire(client))
+                cls._retiring[task] = client
+                task.add_done_callback(lambda done: cls._retiring.pop(done, None))
+
+    @classmethod
+    async def _retire(cls, client: AsyncClient) -> None:
+        """Close an idle client once requests still using it had time to finish."""
+        try:
+            await asyncio.sleep(XUI_TIMEOUT)
+        finally:
+            await client.aclose()
+
+    @classmethod
+    async def close(cls) -> None:
+        """Close every pooled client, used from the API shutdown hook."""
+        clients = list(cls._clients.values()) + list(cls._retiring.values())
+        cls._clients.clear()
+        cls._used.clear()
+        retiring = list(cls._retiring)
+        cls._retiring.clear()
+        for task in retiring:
+            task.cancel()
+        await asyncio.gather(*retiring, *(client.aclose() for client in clients), return_exceptions=True)
+        if clients:
+            logger.info(f"Closed {len(clients)} pooled XUI clients")
@@ -1,9 +1,10 @@
 import json
 import base64
 from typing import Optional, Dict, List
-from httpx import AsyncClient, Response
-from src.config import logger
+from httpx import Response
+from src.config import XUI_CREATE_CHUNK_SIZE, logger
 from .types import Inbound, ClientRequest
+from .pool import XUIClientPool
 
 
 class XUIRequest:
@@ -27,14 +28,14 @@ class XUIRequest:
         cookies: Optional[dict] = None,
     ) -> Dict[str, str]:
         try:
-            async with AsyncClient(cookies=cookies) as client:
-                response = await client.request(
-                    method=method,
-                    url=url,
-                    headers=cls._get_headers(),
-                    json=json,
-                    params=params,
-                )
+            client = await XUIClientPool.get(url, cookies=cookies)
+            response = await client.request(
+                method=method,
+                url=url,
+                headers=cls._get_headers(),
+                json=json,
+                params=params,
+            )
             response.raise_for_status()
             if not response.json().get("success"):
                 logger.error(f"Request to {url} failed [{json}]: {response.json().get('msg', 'Unknown error')}")
@@ -44,10 +45,10 @@ class XUIRequest:
             return {"success": False, "msg": str(e), "obj": None}
 
     @classmethod
-    async def get_links(cls, host: str) -> List[str]:
+    async def get_links(cls, host: str) -> Optional[List[str]]:
         try:
-            async with AsyncClient() as client:
-                response = await client.get(url=host)
+            client = await XUIClientPool.get(host)
+            response = await client.get(url=host)
             response.raise_for_status()
             content = response.read()
             try:
@@ -57,25 +58,30 @@ class XUIRequest:
             return [link.strip() for link in decode.split("\n") if link.strip()]
         except Exception as e:
             logger.error(f"Request to {host} failed: {e}")
-            return []
+            return None
 
     @classmethod
     async def login(cls, host: str, username: str, password: str) -> Optional[Response]:
         try:
-            async with AsyncClient() as client:
-                response = await client.request(
-                    method="POST",
-                    url=f"{host}/login",
-                    headers=cls._get_headers(),
-                    json={"username": username, "password": password},
-                )
-                if response.status_code != 200:
-                    return
-                return response
+            client = await XUIClientPool.get(host, login=True)
+            response = await client.request(
+                method="POST",
+                url=f"{host}/login",
+                headers=cls._get_headers(),
+                json={"username": username, "password": password},
+            )
+            client.cookies.clear()
+            if response.status_code != 200:
+                return
+            return response
         except Exception as e:
             logger.error(f"Login failed: {e}")
             return
 
+    @classmethod
+    async def close(cls) -> None:
+        await XUIClientPool.close()
+
     @classmethod
     async def get_inbounds(cls, host: str, cookies: dict) -> Optional[List[Inbound]]:
         inbounds = await cls._send(url=f"{host}/panel/api/inbounds/list", method="GET", cookies=cookies)
@@ -119,6 +125,31 @@ class XUIRequest:
         )
         return True if result["success"] else False
 
+    @classmethod
+    async def create_clients(
+        cls,
+        host: str,
+        cookies: dict,
+        inbound_id: int,
+        clients: List[ClientRequest],
+        chunk_size: int = XUI_CREATE_CHUNK_SIZE,
+    ) -> List[str]:
+        """Create clients in chunked addClient calls, retrying a failed chunk one client at a time."""
+        created = []
+        chunk_size = max(1, chunk_size)
+        for start in range(0, len(clients), chunk_size):
+            chunk = clients[start : start + chunk_size]
+            if await cls.create_client(host=host, cookies=cookies, inbound_id=inbound_id, clients=chunk):
+                created.extend(client.id for client in chunk)
+                continue
+            if len(chunk) == 1:
+                continue
+            logger.warning(f"Batch create of {len(chunk)} clients failed on inbound {inbound_id}, retrying one by one")
+            for client in chunk:
+                if await cls.create_client(host=host, cookies=cookies, inbound_id=inbound_id, clients=[client]):
+                    created.append(client.id)
+        return created
+
     @classmethod
     async def deactivate_client(cls, host: str, cookies: dict, inbound_id: int, client_id: str) -> bool:
         target = cls.generate_client_identifier(inbound_id, client_id)
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import os
+from hashlib import sha256
+from time import monotonic, time
+from dataclasses import dataclass, asdict
+from typing import ClassVar, Dict, List, Optional, Tuple
+from src.db import Server, Subscription
+from src.config import LINK_REFRESH_INTERVAL, LINK_SNAPSHOT_PATH, XUI_LINKS_STALE_TTL, SUBS_CHECKER_CONCURRENCY, logger
+from src.utils.cache import GuardCache
+from .request import XUIRequest
+
+
+@dataclass
+class LinkSnapshot:
+    links: List[str]
+    digest: str
+    fetched_at: float
+
+    # One refresh cycle plus slack for the cycle spreading its requests over the interval.
+    FRESH_TTL: ClassVar[float] = LINK_REFRESH_INTERVAL * 1.5
+
+    @property
+    def fresh(self) -> bool:
+        """Recent enough to serve without asking the panel."""
+        return time() - self.fetched_at < self.FRESH_TTL
+
+    @property
+    def servable(self) -> bool:
+        """Recent enough to serve when the panel fetch failed or timed out."""
+        return time() - self.fetched_at < XUI_LINKS_STALE_TTL
+
+
+class LinkSnapshotStore:
+    """Decoded panel /sub output per (server, server_key), refreshed in the background."""
+
+    _snapshots: ClassVar[Dict[Tuple[int, str], LinkSnapshot]] = {}
+
+    @classmethod
+    def _digest(cls, links: List[str]) -> str:
+        return sha256("\n".join(links).encode()).hexdigest()
+
+    @classmethod
+    def get(cls, server_id: int, server_key: str) -> Optional[LinkSnapshot]:
+        return cls._snapshots.get((server_id, server_key))
+
+    @classmethod
+    def put(cls, server_id: int, server_key: str, links: List[str]) -> bool:
+        """Store fetched links and return whether they differ from the previous snapshot."""
+        digest = cls._digest(links)
+        previous = cls._snapshots.get((server_id, server_key))
+        cls._snapshots[(server_id, server_key)] = LinkSnapshot(links=links, digest=digest, fetched_at=time())
+        return previous is None or previous.digest != digest
+
+    @classmethod
+    async def refresh(cls, server: Server, sub: Subscription) -> None:
+        links = await XUIRequest.get_links(f"{server.sub_host}/{sub.server_key}")
+        if links is None:
+            return
+        if cls.put(server.id, sub.server_key, links):
+            GuardCache.invalidate_tag(sub.id)
+
+    @classmethod
+    async def refresh_all(cls, servers: List[Server], subs: List[Subscription], window: float) -> None:
+        """Refresh every pair, spreading the requests evenly over ``window`` seconds."""
+        server_ids = {server.id for server in servers}
+        server_keys = {sub.server_key for sub in subs}
+        for key in [key for key in cls._snapshots if key[0] not in server_ids or key[1] not in server_keys]:
+            cls._snapshots.pop(key, None)
+        total = len(servers) * len(subs)
+        if not total:
+            return
+
+        step = window / total
+        started = monotonic()
+        # One shared iterator feeds a fixed set of workers, so only the workers are ever alive at once.
+        pairs = enumerate((server, sub) for sub in subs for server in servers)
+
+        async def _worker() -> None:
+            for index, (server, sub) in pairs:
+                delay = started + index * step - monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await cls.refresh(server, sub)
+
+        await asyncio.gather(*[_worker() for _ in range(min(SUBS_CHECKER_CONCURRENCY, total))])
+        await cls.save()
+
+    @classmethod
+    async def load(cls) -> None:
+        if not LINK_SNAPSHOT_PATH or not os.path.exists(LINK_SNAPSHOT_PATH):
+            return
+        try:
+            data = await asyncio.to_thread(cls._read, LINK_SNAPSHOT_PATH)
+        except Exception as e:
+            logger.warning(f"Failed to load link snapshots: {e}")
+            return
+        for key, item in data.items():
+            server_id, server_key = key.split("|", 1)
+            cls._snapshots[(int(server_id), server_key)] = LinkSnapshot(**item)
+        logger.info(f"Loaded {len(data)} link snapshots")
+
+    @classmethod
+    async def save(cls) -> None:
+        if not LINK_SNAPSHOT_PATH:
+            return
+        data = {f"{server_id}|{server_key}": asdict(item) for (server_id, server_key), item in cls._snapshots.items()}
+        try:
+            await asyncio.to_thread(cls._write, LINK_SNAPSHOT_PATH, data)
+        except Exception as e:
+            logger.warning(f"Failed to save link snapshots: {e}")
+
+    @staticmethod
+    def _read(path: str) -> dict:
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    @staticmethod
+    def _write(path: str, data: dict) -> None:
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+        os.replace(tmp, path)
@@ -0,0 +1,159 @@
+import asyncio
+import base64
+from collections import Counter
+from dataclasses import dataclass
+from typing import ClassVar, Dict, List, Optional, Set
+from src.db import Server
+from src.config import logger
+from .request import XUIRequest
+from .types import Inbound
+
+
+@dataclass
+class LinkTemplate:
+    inbound_id: int
+    identifier: str
+    links: List[str]
+
+
+@dataclass
+class ServerTemplates:
+    templates: List[LinkTemplate]
+    members: Dict[int, Set[str]]
+    known: Set[str]
+
+
+class LinkTemplateStore:
+    """Template links per (server, inbound), rendered locally for the clients enabled on each inbound."""
+
+    _templates: ClassVar[Dict[int, ServerTemplates]] = {}
+
+    @classmethod
+    def _b64decode(cls, value: str) -> Optional[str]:
+        try:
+            return base64.b64decode(value + "=" * (-len(value) % 4)).decode("utf-8")
+        except Exception:
+            return None
+
+    @classmethod
+    def _b64encode(cls, value: str, padded: bool) -> str:
+        encoded = base64.b64encode(value.encode("utf-8")).decode()
+        return encoded if padded else encoded.rstrip("=")
+
+    @classmethod
+    def _decoded(cls, link: str) -> str:
+        if link.startswith("vmess://"):
+            return cls._b64decode(link[8:]) or link
+        if link.startswith("ss://") and "@" in link:
+            userinfo, rest = link[5:].split("@", 1)
+            return f"ss://{cls._b64decode(userinfo) or userinfo}@{rest}"
+        return link
+
+    @classmethod
+    def substitute(cls, link: str, old: str, new: str) -> str:
+        """Swap a client identifier inside a share link, including base64-encoded parts."""
+        if link.startswith("vmess://"):
+            decoded = cls._b64decode(link[8:])
+            if decoded is not None:
+                return "vmess://" + cls._b64encode(decoded.replace(old, new), padded=link.endswith("="))
+        elif link.startswith("ss://") and "@" in link:
+            userinfo, rest = link[5:].split("@", 1)
+            decoded = cls._b64decode(userinfo)
+            if decoded is not None and old in decoded:
+                userinfo = cls._b64encode(decoded.replace(old, new), padded=userinfo.endswith("="))
+            return f"ss://{userinfo}@{rest.replace(old, new)}"
+        return link.replace(old, new)
+
+    @classmethod
+    def _cover(cls, members: Dict[int, Set[str]]) -> Dict[int, str]:
+        """Pick as few clients as possible so that every inbound with clients gets one; return inbound -> subId."""
+        left = {inbound_id: keys for inbound_id, keys in members.items() if keys}
+        chosen = {}
+        while left:
+            key = Counter(key for keys in left.values() for key in keys).most_common(1)[0][0]
+            for inbound_id in [inbound_id for inbound_id, keys in left.items() if key in keys]:
+                chosen[inbound_id] = key
+                del left[inbound_id]
+        return chosen
+
+    @classmethod
+    def _group(cls, links: List[str], server_key: str, inbound_ids: List[int]) -> Optional[Dict[int, List[str]]]:
+        """Split one client's /sub output by inbound, or None when a link matches none of them."""
+        identifiers = {inbound_id: XUIRequest.generate_client_identifier(inbound_id, server_key) for inbound_id in inbound_ids}
+        groups: Dict[int, List[str]] = {inbound_id: [] for inbound_id in inbound_ids}
+        for link in links:
+            decoded = cls._decoded(link)
+            inbound_id = next((inbound_id for inbound_id, ident in identifiers.items() if ident in decoded), None)
+            if inbound_id is None:
+                return None
+            groups[inbound_id].append(link)
+        return groups
+
+    @classmethod
+    def _render(cls, template: LinkTemplate, server_key: str) -> List[str]:
+        identifier = XUIRequest.generate_client_identifier(template.inbound_id, server_key)
+        return [cls.substitute(link, template.identifier, identifier) for link in template.links]
+
+    @classmethod
+    async def build(cls, server: Server, inbounds: List[Inbound]) -> bool:
+        """Derive per-inbound templates from sample clients and check them against a second client per inbound.
+
+        Return False, leaving the server to per-sub snapshots, when any inbound cannot be templated exactly.
+        """
+        members = {
+            inbound.id: {client.subId for client in inbound.clientStats if client.subId and client.enable}
+            for inbound in inbounds
+            if inbound.enable
+        }
+        samples = cls._cover(members)
+        if not samples:
+            cls._templates.pop(server.id, None)
+            return False
+        checks = cls._cover({inbound_id: members[inbound_id] - {key} for inbound_id, key in samples.items()})
+
+        keys = sorted(set(samples.values()) | set(checks.values()))
+        fetched = await asyncio.gather(*[XUIRequest.get_links(f"{server.sub_host}/{key}") for key in keys])
+        groups = {}
+        for key, links in zip(keys, fetched):
+            grouped = None
+            if links is not None:
+                grouped = cls._group(links, key, [inbound_id for inbound_id, ids in members.items() if key in ids])
+            if grouped is None:
+                logger.warning(f"Link templates for server {server.id} could not match the output of client {key}")
+                return False
+            groups[key] = grouped
+
+        templates = [
+            LinkTemplate(
+                inbound_id=inbound.id,
+                identifier=XUIRequest.generate_client_identifier(inbound.id, samples[inbound.id]),
+                links=groups[samples[inbound.id]][inbound.id],
+            )
+            for inbound in inbounds
+            if inbound.id in samples
+        ]
+        for template in templates:
+            key = checks.get(template.inbound_id)
+            if key and cls._render(template, key) != groups[key][template.inbound_id]:
+                logger.warning(f"Links of inbound {template.inbound_id} on server {server.id} differ per client")
+                return False
+
+        known = {client.subId for inbound in inbounds for client in inbound.clientStats if client.subId}
+        cls._templates[server.id] = ServerTemplates(templates=templates, members=members, known=known)
+        return True
+
+    @classmethod
+    def render(cls, server_id: int, server_key: str) -> Optional[List[str]]:
+        """Render the links the panel would return, or None when the server or client is not covered by templates."""
+        entry = cls._templates.get(server_id)
+        if entry is None or server_key not in entry.known:
+            return None
+        links = []
+        for template in entry.templates:
+            if server_key in entry.members[template.inbound_id]:
+                links.extend(cls._render(template, server_key))
+        return links
+
+    @classmethod
+    def drop(cls, server_id: int) -> None:
+        cls._templates.pop(server_id, None)
@@ -0,0 +1,95 @@
+import asyncio
+import os
+import sys
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# src.config requires these at import time.
+os.environ.setdefault("TELEGRAM_ADMINS_ID", "1")
+os.environ.setdefault("TELEGRAM_API_TOKEN", "1:test")
+
+from sqlalchemy import event, text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.pool import NullPool  # noqa: E402
+from sqlalchemy.schema import CreateIndex, CreateTable  # noqa: E402
+
+from src.db import Base  # noqa: E402
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL", "")
+
+
+class QueryCounter:
+    """Record every statement an engine sends to the database."""
+
+    def __init__(self, engine: AsyncEngine):
+        self.statements: List[str] = []
+        event.listen(engine.sync_engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    def reset(self) -> None:
+        self.statements.clear()
+
+
+async def _create_schema(url: str) -> None:
+    engine = create_async_engine(url, poolclass=NullPool)
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP SCHEMA IF EXISTS public CASCADE"))
+        await conn.execute(text("CREATE SCHEMA public"))
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        trgm = True
+    except Exception:
+        trgm = False
+    async with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            await conn.execute(CreateTable(table))
+            for index in table.indexes:
+                ops = index.dialect_options["postgresql"]["ops"] or {}
+                if trgm or "gin_trgm_ops" not in ops.values():
+                    await conn.execute(CreateIndex(index))
+    await engine.dispose()
+
+
+async def _truncate(url: str) -> None:
+    engine = create_async_engine(url, poolclass=NullPool)
+    async with engine.begin() as conn:
+        tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+        await conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+    await engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def database_url() -> str:
+    """A Postgres database the suite may wipe, from TEST_DATABASE_URL (postgresql+asyncpg://...)."""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    asyncio.run(_create_schema(TEST_DATABASE_URL))
+    return TEST_DATABASE_URL
+
+
+@pytest.fixture
+def database(database_url: str):
+    """Empty every table, then hand out a session factory bound to a fresh engine and its query counter."""
+    asyncio.run(_truncate(database_url))
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    counter = QueryCounter(engine)
+    sessions = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False, class_=AsyncSession)
+
+    @asynccontextmanager
+    async def session() -> AsyncIterator[AsyncSession]:
+        async with sessions() as db:
+            async with db.begin():
+                yield db
+
+    yield session, counter
@@ -0,0 +1,81 @@
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+
+from src.db import CacheBus, CacheEvent, Server, Subscription, SubscriptionUsage
+from src.utils.cache import GuardCache
+
+KEY = "fedcba9876543210"
+
+
+@pytest.fixture
+def cached_sub(database):
+    session, _ = database
+
+    async def seed() -> None:
+        async with session() as db:
+            db.add(
+                Subscription(
+                    id=1, remark="bus", server_key="k", access_key=KEY, expire=0, limit_usage=0, created_at=datetime.now()
+                )
+            )
+
+    asyncio.run(seed())
+    GuardCache.clear()
+    GuardCache.set(KEY, "cached", tag=1)
+    yield session
+    GuardCache.clear()
+
+
+def test_local_eviction_waits_for_commit(cached_sub):
+    async def run() -> None:
+        async with cached_sub() as db:
+            sub = await Subscription.get_by_access_key(db, KEY)
+            await Subscription.update(db, sub=sub, remark="renamed")
+            assert GuardCache.get(KEY) == "cached"
+        assert GuardCache.get(KEY) is None
+
+    asyncio.run(run())
+
+
+def test_rolled_back_change_keeps_the_cache(cached_sub):
+    class Abort(Exception):
+        pass
+
+    async def run() -> None:
+        with pytest.raises(Abort):
+            async with cached_sub() as db:
+                sub = await Subscription.get_by_access_key(db, KEY)
+                await Subscription.update(db, sub=sub, remark="renamed")
+                raise Abort()
+        assert GuardCache.get(KEY) == "cached"
+        async with cached_sub() as db:
+            sub = await Subscription.get_by_access_key(db, KEY)
+            await Subscription.update(db, sub=sub, limit_usage=1)
+        assert GuardCache.get(KEY) is None
+
+    asyncio.run(run())
+
+
+def test_usage_refresh_evicts_after_commit(cached_sub):
+    async def run() -> None:
+        async with cached_sub() as db:
+            db.add(Server(id=1, remark="server", enabled=True, removed=False, config={"host": "h", "sub": "s"}))
+            await db.flush()
+            db.add(SubscriptionUsage(sub_id=1, server_id=1, inbound_id=1, client_id=1, usage=1024))
+            await db.flush()
+            await Subscription.refresh_usage_totals(db, [1])
+            assert GuardCache.get(KEY) == "cached"
+        assert GuardCache.get(KEY) is None
+
+    asyncio.run(run())
+
+
+def test_batched_notification_evicts_every_id(cached_sub):
+    GuardCache.set("other", "cached", tag=2)
+    payload = json.dumps({"event": CacheEvent.SUBSCRIPTION, "ids": [1, 2], "origin": "elsewhere"})
+    CacheBus._on_notify(None, 0, CacheBus.channel, payload)
+    assert GuardCache.get(KEY) is None
+    assert GuardCache.get("other") is None
@@ -0,0 +1,87 @@
+import asyncio
+from datetime import datetime
+from time import time
+
+import pytest
+
+from src.db import Server, Subscription
+from src.tasks import enforcer
+from src.tasks.enforcer import SubscriptionEnforcer
+
+
+def test_deadline_fires_only_once_the_subscription_counts_as_expired():
+    wheel = SubscriptionEnforcer()
+    wheel._push(1, 100)
+    wheel._push(2, 200)
+    assert wheel._pop_due(100.9) == []
+    assert wheel._pop_due(101.0) == [(1, 100)]
+
+
+def test_stale_heap_entries_are_skipped():
+    wheel = SubscriptionEnforcer()
+    wheel._push(1, 100)
+    wheel._push(1, 300)
+    assert wheel._pop_due(250) == []
+    assert wheel._pop_due(301) == [(1, 300)]
+
+
+def test_change_is_marked_without_delay():
+    wheel = SubscriptionEnforcer()
+    wheel.on_change(5)
+    assert wheel._dirty == set()
+
+    async def run() -> None:
+        wheel._task = asyncio.current_task()
+        wheel.on_change(5)
+        assert wheel._dirty == {5} and wheel._wake.is_set()
+        wheel.on_change(None)
+        assert wheel._reload
+
+    asyncio.run(run())
+
+
+@pytest.fixture
+def deactivations(database, monkeypatch):
+    session, _ = database
+    calls = []
+
+    async def deactivate(servers, uuid):
+        calls.append((sorted(server.id for server in servers), uuid))
+        return True
+
+    monkeypatch.setattr(enforcer, "GetDB", session)
+    monkeypatch.setattr(enforcer.XUIManager, "deactivate", deactivate)
+
+    async def seed() -> None:
+        async with session() as db:
+            db.add(Server(id=1, remark="server", enabled=True, removed=False, config={"host": "h", "sub": "s"}))
+            now = int(time())
+            for id, expire in ((1, now - 5), (2, now + 3600)):
+                db.add(
+                    Subscription(
+                        id=id,
+                        remark=f"sub-{id}",
+                        server_key=f"key-{id}",
+                        access_key=f"{id:016d}",
+                        expire=expire,
+                        limit_usage=0,
+                        created_at=datetime.now(),
+                    )
+                )
+
+    asyncio.run(seed())
+    return calls
+
+
+def test_expired_subscription_is_deactivated_on_every_server(deactivations):
+    wheel = SubscriptionEnforcer()
+    asyncio.run(wheel._deactivate(1, "expire", since=time() - 5))
+    assert deactivations == [([1], "key-1")]
+    assert wheel._dirty == set()
+
+
+def test_available_subscription_has_its_deadline_re_read(deactivations):
+    wheel = SubscriptionEnforcer()
+    asyncio.run(wheel._deactivate(2, "expire", since=time()))
+    assert deactivations == []
+    assert wheel._dirty == {2}
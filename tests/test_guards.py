@@ -0,0 +1,110 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from starlette.requests import Request
+
+from src.api.routers.guards import get_subscription
+from src.db import Server, Setting, Subscription, SubscriptionTouches
+from src.utils.cache import GuardCache
+from src.xui import XUIManager
+
+KEY = "0123456789abcdef"
+
+
+async def _seed(db, expire: int = 0) -> None:
+    db.add(Setting(id=1, shuffle=False, placeholders=[], informations=[]))
+    for id, enabled in ((1, True), (2, True), (3, False)):
+        db.add(
+            Server(
+                id=id,
+                remark=f"server-{id}",
+                enabled=enabled,
+                removed=False,
+                config={"host": f"https://panel{id}.example", "sub": f"https://panel{id}.example/sub"},
+            )
+        )
+    db.add(
+        Subscription(
+            id=1,
+            remark="guarded",
+            server_key="00000000-1111-2222-3333-444444444444",
+            access_key=KEY,
+            expire=expire,
+            limit_usage=0,
+            created_at=datetime.now(),
+        )
+    )
+
+
+def _request() -> Request:
+    return Request({"type": "http", "method": "GET", "path": f"/guards/{KEY}", "headers": []})
+
+
+@pytest.fixture
+def guard(database, monkeypatch):
+    session, counter = database
+
+    async def fetch_links(servers, server_key):
+        return [f"vless://{server_key}@{server.remark}.example:443#{server.remark}" for server in servers]
+
+    monkeypatch.setattr(XUIManager, "fetch_links", fetch_links)
+
+    async def prepare() -> None:
+        async with session() as db:
+            await _seed(db)
+        async with session() as db:
+            await Setting.get(db, cache=False)
+
+    asyncio.run(prepare())
+    GuardCache.clear()
+    counter.reset()
+    yield session, counter
+    GuardCache.clear()
+    Setting._cache = None
+    SubscriptionTouches._pending.clear()
+
+
+def test_guard_miss_issues_one_query_and_hit_none(guard):
+    session, counter = guard
+
+    async def request() -> bytes:
+        async with session() as db:
+            response = await get_subscription(KEY, db, _request())
+        return response.body
+
+    miss = asyncio.run(request())
+    assert len(counter) == 1, counter.statements
+    assert miss.count(b"vless://") == 2
+
+    counter.reset()
+    hit = asyncio.run(request())
+    assert len(counter) == 0, counter.statements
+    assert hit == miss
+
+
+def test_guard_starts_first_use_expiry_in_the_request_transaction(database, monkeypatch):
+    session, counter = database
+
+    async def fetch_links(servers, server_key):
+        return []
+
+    monkeypatch.setattr(XUIManager, "fetch_links", fetch_links)
+
+    async def run() -> int:
+        async with session() as db:
+            await _seed(db, expire=-86400)
+        async with session() as db:
+            response = await get_subscription(KEY, db, _request())
+        assert response.status_code == 200
+        async with session() as db:
+            return (await Subscription.get_by_access_key(db, KEY)).expire
+
+    GuardCache.clear()
+    try:
+        expire = asyncio.run(run())
+    finally:
+        GuardCache.clear()
+        Setting._cache = None
+        SubscriptionTouches._pending.clear()
+    assert expire > datetime.now().timestamp() + 86000
@@ -0,0 +1,57 @@
+import asyncio
+
+import asyncpg
+import pytest
+from sqlalchemy.engine import make_url
+
+from src.db import leader
+from src.tasks.manager import SimpleScheduler
+
+
+@pytest.fixture
+def managers(database_url, monkeypatch):
+    dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+    leading = []
+
+    async def lead(self) -> None:
+        leading.append(self)
+
+    async def follow(self) -> None:
+        leading.remove(self)
+
+    monkeypatch.setattr(leader, "connect_dedicated", lambda: asyncpg.connect(dsn))
+    monkeypatch.setattr(leader, "LEADER_RETRY_INTERVAL", 0.05)
+    monkeypatch.setattr(SimpleScheduler, "lead", lead)
+    monkeypatch.setattr(SimpleScheduler, "follow", follow)
+    return [SimpleScheduler(), SimpleScheduler()], leading
+
+
+async def _settle(leading: list) -> None:
+    for _ in range(100):
+        if leading:
+            break
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(0.3)
+
+
+def test_exactly_one_manager_leads_and_another_takes_over(managers):
+    workers, leading = managers
+
+    async def run() -> None:
+        for worker in workers:
+            await worker.start()
+        try:
+            await _settle(leading)
+            assert len(leading) == 1
+            first = leading[0]
+            assert [worker.election.leader for worker in workers].count(True) == 1
+
+            await first.stop()
+            await _settle(leading)
+            assert leading == [next(worker for worker in workers if worker is not first)]
+        finally:
+            for worker in workers:
+                await worker.stop()
+        assert leading == []
+
+    asyncio.run(run())
@@ -0,0 +1,156 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+
+from src.api.routers.dep import get_headers
+from src.db import LoadProfile, Server, ServerAccess, Subscription, SubscriptionUsage, User
+from src.keys import BotKB
+from src.lang import DialogText
+from src.tasks.planner import plan_server
+from src.xui import Inbound
+
+
+async def _seed(db) -> None:
+    db.add(User(id=10, full_name="Owner One", username="owner"))
+    for id in (1, 2):
+        db.add(Server(id=id, remark=f"server-{id}", enabled=True, removed=False, config={"host": "h", "sub": "s"}))
+    await db.flush()
+    db.add(ServerAccess(id=1, server_id=1, access={"session": "x"}))
+    now = datetime.now()
+    for id in range(1, 26):
+        db.add(
+            Subscription(
+                id=id,
+                remark=f"sub-{id}",
+                server_key=f"00000000-0000-0000-0000-{id:012d}",
+                access_key=f"{id:016d}",
+                owner=10 if id % 2 else None,
+                expire=0 if id % 3 else -86400,
+                limit_usage=0 if id % 4 else 10 * 1024**3,
+                lifetime_usage=id * 1024**2,
+                created_at=now - timedelta(minutes=id),
+            )
+        )
+    await db.flush()
+    for server_id in (1, 2):
+        db.add(SubscriptionUsage(sub_id=1, server_id=server_id, inbound_id=1, client_id=server_id, usage=512 * 1024**2))
+
+
+@pytest.fixture
+def seeded(database):
+    session, counter = database
+
+    async def seed() -> None:
+        async with session() as db:
+            await _seed(db)
+
+    asyncio.run(seed())
+    Subscription._count = None
+    counter.reset()
+    yield session, counter
+    Subscription._count = None
+
+
+def _run(session, call):
+    async def run():
+        async with session() as db:
+            return await call(db)
+
+    return asyncio.run(run())
+
+
+def test_listing_renders_menu_from_three_queries(seeded):
+    session, counter = seeded
+
+    async def call(db):
+        pagination = await Subscription.get_paginated(db, profile=LoadProfile.LISTING)
+        queries = len(counter)
+        markup = BotKB.subs_menu(pagination=pagination)
+        return pagination, queries, markup
+
+    pagination, queries, markup = _run(session, call)
+    # count, page, owners
+    assert queries == 3, counter.statements
+    assert len(counter) == 3
+    assert len(pagination.items) == 20
+    assert "[Owner One]" in pagination.items[0].kb_remark
+    assert markup.inline_keyboard
+
+
+def test_listing_search_renders_results_from_two_queries(seeded):
+    session, counter = seeded
+
+    async def call(db):
+        items = await Subscription.search(db, "owner", profile=LoadProfile.LISTING)
+        return items, BotKB.subs_search(items)
+
+    items, markup = _run(session, call)
+    # matches, owners
+    assert len(counter) == 2, counter.statements
+    assert len(items) == 13
+    assert markup.inline_keyboard
+
+
+def test_detail_renders_info_and_qrcode_from_four_queries(seeded):
+    session, counter = seeded
+
+    async def call(db):
+        sub = await Subscription.get_by_id(db, 1, LoadProfile.DETAIL)
+        queries = len(counter)
+        info = DialogText.SUBS_INFO.format(**sub.format())
+        qrcode = DialogText.SUBS_QRCODE.format(**sub.format())
+        return queries, info, qrcode, BotKB.subs_update(sub)
+
+    queries, info, qrcode, markup = _run(session, call)
+    # subscription, owner, usages, usage servers
+    assert queries == 4, counter.statements
+    assert len(counter) == 4
+    assert "server-1 -> 0.5 GB" in info and "server-2 -> 0.5 GB" in info
+    assert "Owner One" in info
+    assert qrcode and markup.inline_keyboard
+
+
+def test_guard_renders_headers_and_placeholders_from_one_query(seeded):
+    session, counter = seeded
+
+    async def call(db):
+        sub, servers = await Subscription.get_for_guard(db, f"{3:016d}")
+        headers = get_headers(sub)
+        remark = "{EMOJI} {REMARK} {EXPIRE} {LEFT_USAGE}".format(**sub.config_format())
+        return sub, servers, headers, remark
+
+    sub, servers, headers, remark = _run(session, call)
+    assert len(counter) == 1, counter.statements
+    assert sorted(server.id for server in servers) == [1, 2]
+    assert "download=" in headers["subscription-userinfo"]
+    assert remark.startswith(sub.emoji)
+    with pytest.raises(InvalidRequestError):
+        sub.usages
+
+
+def test_sync_plans_servers_from_one_query(seeded):
+    session, counter = seeded
+
+    async def call(db):
+        subs = await Subscription.get_all(db, removed=None, profile=LoadProfile.SYNC)
+        servers = await Server.get_all(db)
+        return subs, servers
+
+    subs, servers = _run(session, call)
+    # subscriptions, servers with their joined access rows
+    assert len(counter) == 2, counter.statements
+    inbound = Inbound(
+        id=1,
+        remark="in",
+        enable=True,
+        clientStats=[],
+        settings=json.dumps({"clients": []}),
+    )
+    plan = plan_server(servers[0], [inbound], subs)
+    assert len(plan.changes) == len([sub for sub in subs if sub.availabled])
+    assert len(counter) == 2
+    with pytest.raises(InvalidRequestError):
+        subs[0].user
@@ -0,0 +1,112 @@
+from time import perf_counter, time
+from types import SimpleNamespace
+
+from src.db import Server, Subscription
+from src.tasks.planner import SyncActionType, plan_server
+
+
+def _server(id: int = 1, enabled: bool = True, removed: bool = False) -> Server:
+    return Server(id=id, remark=f"server-{id}", enabled=enabled, removed=removed, config={"host": "h", "sub": "s"})
+
+
+def _sub(id: int, **fields) -> Subscription:
+    values = dict(enabled=True, activated=True, removed=False, expire=0, limit_usage=0, offset_usage=0, lifetime_usage=0)
+    values.update(fields)
+    return Subscription(id=id, remark=f"sub-{id}", server_key=f"key-{id}", access_key=f"{id:016d}", **values)
+
+
+def _client(id: int, key: str, enable: bool = True, all_time: int = 0):
+    return SimpleNamespace(id=id, subId=key, enable=enable, allTime=all_time)
+
+
+def _inbound(id: int, *clients):
+    return SimpleNamespace(id=id, clientStats=list(clients))
+
+
+def _actions(plan, inbound_id: int = 1):
+    return [(action.type, action.sub_id) for action in plan.inbounds.get(inbound_id, [])]
+
+
+def test_missing_client_of_available_sub_is_created():
+    plan = plan_server(_server(), [_inbound(1)], [_sub(1)])
+    assert _actions(plan) == [(SyncActionType.CREATE, 1)]
+    assert plan.changes[0][1].server_key == "key-1"
+
+
+def test_unavailable_subs_and_servers_get_no_clients():
+    expired = _sub(2, expire=int(time()) - 10)
+    limited = _sub(3, limit_usage=100, lifetime_usage=100)
+    assert _actions(plan_server(_server(), [_inbound(1)], [_sub(1, enabled=False), expired, limited])) == []
+    assert _actions(plan_server(_server(enabled=False), [_inbound(1)], [_sub(1)])) == []
+    assert _actions(plan_server(_server(removed=True), [_inbound(1)], [_sub(1)])) == []
+
+
+def test_enabled_client_of_unavailable_sub_is_disabled():
+    inbound = _inbound(1, _client(10, "key-1"), _client(11, "key-2", enable=False))
+    plan = plan_server(_server(), [inbound], [_sub(1, enabled=False), _sub(2, enabled=False)])
+    assert _actions(plan) == [(SyncActionType.DISABLE, 1)]
+    assert plan.inbounds[1][0].client_id == 10
+
+
+def test_clients_on_a_disabled_server_are_disabled():
+    inbound = _inbound(1, _client(10, "key-1"))
+    assert _actions(plan_server(_server(enabled=False), [inbound], [_sub(1)])) == [(SyncActionType.DISABLE, 1)]
+
+
+def test_disabled_client_of_available_sub_is_enabled():
+    inbound = _inbound(1, _client(10, "key-1", enable=False), _client(11, "key-2"))
+    assert _actions(plan_server(_server(), [inbound], [_sub(1), _sub(2)])) == [(SyncActionType.ENABLE, 1)]
+
+
+def test_client_of_removed_sub_is_deleted():
+    inbound = _inbound(1, _client(10, "key-1"))
+    plan = plan_server(_server(), [inbound], [_sub(1, removed=True)])
+    assert _actions(plan) == [(SyncActionType.DELETE, 1)]
+    assert plan.inbounds[1][0].client_id == 10
+
+
+def test_clients_unknown_locally_are_left_alone():
+    inbound = _inbound(1, _client(10, "someone-else"), _client(11, "key-1"))
+    assert plan_server(_server(), [inbound], [_sub(1)]).inbounds == {}
+
+
+def test_usage_is_written_only_when_it_changed():
+    inbound = _inbound(1, _client(10, "key-1", all_time=500), _client(11, "key-2", all_time=700), _client(12, "key-3"))
+    subs = [_sub(1), _sub(2), _sub(3)]
+    usages = {(1, 1, 1, 10): 500, (2, 1, 1, 11): 300}
+    plan = plan_server(_server(), [inbound], subs, usages)
+    assert _actions(plan) == [(SyncActionType.USAGE, 2)]
+    assert plan.changes == []
+    assert [(inbound_id, action.usage) for inbound_id, action in plan.usages] == [(1, 700)]
+
+
+def test_first_usage_of_a_client_is_recorded():
+    plan = plan_server(_server(), [_inbound(1, _client(10, "key-1", all_time=5))], [_sub(1)])
+    assert [action.usage for _, action in plan.usages] == [5]
+
+
+def test_actions_are_grouped_per_inbound():
+    inbounds = [_inbound(1, _client(10, "key-1")), _inbound(2)]
+    plan = plan_server(_server(), inbounds, [_sub(1)])
+    assert _actions(plan, 1) == []
+    assert _actions(plan, 2) == [(SyncActionType.CREATE, 1)]
+    assert list(plan.inbounds) == [2]
+
+
+def test_planning_a_large_synced_fleet_is_fast_and_empty():
+    count = 100_000
+    server = SimpleNamespace(id=1, enabled=True, availabled=True)
+    subs = [
+        SimpleNamespace(id=id, server_key=f"key-{id}", remark=f"sub-{id}", availabled=True, removed=False)
+        for id in range(count)
+    ]
+    inbounds = [_inbound(inbound_id, *(_client(id, f"key-{id}", all_time=id) for id in range(count))) for inbound_id in (1, 2)]
+    usages = {(id, 1, inbound_id, id): id for id in range(count) for inbound_id in (1, 2)}
+
+    started = perf_counter()
+    plan = plan_server(server, inbounds, subs, usages)
+    elapsed = perf_counter() - started
+
+    assert plan.inbounds == {}
+    # Two inbounds x 100k subscriptions; a linear pass takes well under a second.
+    assert elapsed < 5, f"planning {count} subscriptions took {elapsed:.2f}s"
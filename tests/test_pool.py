@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from src.xui import pool
+from src.xui.pool import XUIClientPool
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(pool, "monotonic", lambda: now[0])
+    monkeypatch.setattr(pool, "XUI_CLIENT_IDLE_TTL", 60)
+    monkeypatch.setattr(XUIClientPool, "_swept_at", 0.0)
+    yield now
+    asyncio.run(XUIClientPool.close())
+
+
+def test_sessions_behind_one_origin_keep_their_own_clients(clock):
+    async def run():
+        first = await XUIClientPool.get("https://panel.example/a/panel", cookies={"session": "a"})
+        second = await XUIClientPool.get("https://panel.example/b/panel", cookies={"session": "b"})
+        again = await XUIClientPool.get("https://panel.example/a/panel", cookies={"session": "a"})
+        return first, second, again
+
+    first, second, again = asyncio.run(run())
+    assert first is again and first is not second
+    assert not first.is_closed and not second.is_closed
+    assert XUIClientPool._retiring == {}
+
+
+def test_idle_clients_are_retired_and_closed(clock):
+    async def run():
+        old = await XUIClientPool.get("https://panel.example/panel", cookies={"session": "old"})
+        clock[0] += 45
+        fresh = await XUIClientPool.get("https://panel.example/panel", cookies={"session": "new"})
+        clock[0] += 45
+        await XUIClientPool.get("https://panel.example/panel", cookies={"session": "new"})
+        assert list(XUIClientPool._retiring.values()) == [old]
+        await XUIClientPool.close()
+        return old, fresh
+
+    old, fresh = asyncio.run(run())
+    assert old.is_closed and fresh.is_closed
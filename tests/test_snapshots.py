@@ -0,0 +1,53 @@
+import asyncio
+from time import time
+from types import SimpleNamespace
+from typing import List, Optional
+
+import pytest
+
+from src.xui import LinkSnapshotStore, LinkTemplateStore, XUIManager, XUIRequest
+from src.xui.snapshots import LinkSnapshot
+
+SERVER = SimpleNamespace(id=1, sub_host="https://panel.example/sub")
+KEY = "aaaa0000-1111-2222-3333-444455556666"
+
+
+@pytest.fixture
+def panel(monkeypatch):
+    state = {"links": ["vless://live"], "calls": 0}
+
+    async def get_links(host: str) -> Optional[List[str]]:
+        state["calls"] += 1
+        return state["links"]
+
+    monkeypatch.setattr(XUIRequest, "get_links", get_links)
+    LinkTemplateStore._templates.clear()
+    LinkSnapshotStore._snapshots.clear()
+    yield state
+    LinkSnapshotStore._snapshots.clear()
+
+
+def _snapshot(age: float) -> None:
+    LinkSnapshotStore._snapshots[(SERVER.id, KEY)] = LinkSnapshot(["vless://old"], "digest", time() - age)
+
+
+def test_fresh_snapshot_skips_the_panel(panel):
+    _snapshot(LinkSnapshot.FRESH_TTL / 2)
+    assert asyncio.run(XUIManager.fetch_links([SERVER], KEY)) == ["vless://old"]
+    assert panel["calls"] == 0
+
+
+def test_snapshot_older_than_a_refresh_cycle_is_refetched(panel):
+    _snapshot(LinkSnapshot.FRESH_TTL + 1)
+    assert asyncio.run(XUIManager.fetch_links([SERVER], KEY)) == ["vless://live"]
+    assert panel["calls"] == 1
+    assert LinkSnapshotStore.get(SERVER.id, KEY).fresh
+
+
+def test_failed_fetch_serves_stale_snapshot_within_ttl(panel, monkeypatch):
+    monkeypatch.setattr("src.xui.snapshots.XUI_LINKS_STALE_TTL", 3600)
+    panel["links"] = None
+    _snapshot(LinkSnapshot.FRESH_TTL + 1)
+    assert asyncio.run(XUIManager.fetch_links([SERVER], KEY)) == ["vless://old"]
+    _snapshot(3600 + 1)
+    assert asyncio.run(XUIManager.fetch_links([SERVER], KEY)) == []
@@ -0,0 +1,66 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from src.db import UserState
+from src.utils import state
+from src.utils.state import CachedStorage
+
+
+@pytest.fixture
+def slow_db(database, monkeypatch):
+    session, _ = database
+    holder = {"gate": None, "writing": None}
+
+    @asynccontextmanager
+    async def get_db():
+        async with session() as db:
+            if holder["gate"] is not None and not holder["gate"].is_set():
+                holder["writing"].set()
+                await holder["gate"].wait()
+            yield db
+
+    monkeypatch.setattr(state, "GetDB", get_db)
+    return session, holder
+
+
+def test_key_evicted_during_a_slow_flush_keeps_its_new_state(slow_db):
+    session, holder = slow_db
+
+    async def run() -> None:
+        storage = CachedStorage(maxsize=1, interval=3600)
+        await storage.upsert_context(1, state="editing", step=1)
+        holder["gate"], holder["writing"] = asyncio.Event(), asyncio.Event()
+        flush = asyncio.create_task(storage.flush())
+        await holder["writing"].wait()
+
+        await storage.clear_all(2)
+        assert 1 not in storage._items
+        await asyncio.wait_for(storage.upsert_data(1, step=2), timeout=1)
+
+        holder["gate"].set()
+        assert await flush == 1
+        assert await storage.flush() == 2
+        async with session() as db:
+            row = await db.get(UserState, 1)
+        assert (row.state, row.data) == ("editing", {"step": 2})
+
+    asyncio.run(run())
+
+
+def test_failed_flush_keeps_the_batch_pending(slow_db, monkeypatch):
+    @asynccontextmanager
+    async def broken():
+        raise ConnectionError("down")
+        yield
+
+    async def run() -> None:
+        storage = CachedStorage(maxsize=1, interval=3600)
+        await storage.clear_all(1)
+        monkeypatch.setattr(state, "GetDB", broken)
+        assert await storage.flush() == 0
+        assert list(storage._pending) == [1]
+        assert storage._flushing == {}
+
+    asyncio.run(run())
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from src.api.routers import telegram
+from src.handlers.middlewares import ADMINS
+from src.utils.metrics import Metrics
+
+
+class FakeRequest:
+    headers = {}
+
+    def __init__(self, data: dict):
+        self._data = data
+
+    async def json(self) -> dict:
+        return self._data
+
+
+def _message(user_id: int) -> dict:
+    user = {"id": user_id, "is_bot": False, "first_name": "someone"}
+    return {
+        "update_id": 1,
+        "message": {
+            "message_id": 1,
+            "date": 0,
+            "chat": {"id": user_id, "type": "private", "first_name": "someone"},
+            "from": user,
+            "text": "/start",
+        },
+    }
+
+
+@pytest.fixture
+def submitted(monkeypatch):
+    items = []
+    monkeypatch.setattr(telegram, "TELEGRAM_WEBHOOK_SECRET_KEY", "")
+    monkeypatch.setattr(telegram.TelegramUpdates, "submit", lambda key, item: items.append(key) or True)
+    return items
+
+
+def _unauthorized() -> int:
+    return Metrics.snapshot()["counters"].get("telegram.unauthorized", 0)
+
+
+def test_non_admin_updates_are_dropped_before_queueing(submitted):
+    stranger = max(ADMINS) + 1
+    before = _unauthorized()
+    result = asyncio.run(telegram.telegram_webhook(FakeRequest(_message(stranger))))
+    assert result == {"result": "ignored"}
+    assert submitted == []
+    assert _unauthorized() == before + 1
+
+
+def test_admin_updates_are_queued_per_chat(submitted):
+    admin = next(iter(ADMINS))
+    before = _unauthorized()
+    result = asyncio.run(telegram.telegram_webhook(FakeRequest(_message(admin))))
+    assert result == {"result": "success"}
+    assert submitted == [admin]
+    assert _unauthorized() == before
@@ -0,0 +1,182 @@
+import asyncio
+import base64
+import json
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import pytest
+
+from src.xui import Inbound, LinkTemplateStore, XUIRequest
+
+SERVER = SimpleNamespace(id=1, sub_host="https://panel.example/sub")
+
+
+def _b64(value: str) -> str:
+    return base64.b64encode(value.encode()).decode()
+
+
+class FakePanel:
+    """Builds /sub output the way 3x-ui does: one or more links per enabled inbound the client is enabled on."""
+
+    def __init__(self, inbounds: List[dict]):
+        self.inbounds = inbounds
+
+    def _links(self, inbound: dict, client: dict) -> List[str]:
+        ident = XUIRequest.generate_client_identifier(inbound["id"], client["subId"])
+        remark = f"{inbound['remark']}-{ident}"
+        if inbound.get("show_usage"):
+            remark += f"-{client['down'] // 1024**2}MB"
+        hosts = inbound.get("hosts", ["node.example"])
+        port = inbound["port"]
+        match inbound["protocol"]:
+            case "vless":
+                return [f"vless://{ident}@{host}:{port}?type=tcp&security=reality&sni=a.example#{remark}" for host in hosts]
+            case "trojan":
+                return [f"trojan://{ident}@{host}:{port}?type=ws&path=%2F#{remark}" for host in hosts]
+            case "vmess":
+                return [
+                    "vmess://"
+                    + _b64(json.dumps({"v": "2", "ps": remark, "add": host, "port": port, "id": ident, "net": "ws"}, indent=2))
+                    for host in hosts
+                ]
+            case "shadowsocks":
+                return [f"ss://{_b64(f'2022-blake3-aes-128-gcm:c2VydmVy:{ident}')}@{host}:{port}#{remark}" for host in hosts]
+        raise ValueError(inbound["protocol"])
+
+    def sub(self, key: str) -> List[str]:
+        links = []
+        for inbound in self.inbounds:
+            if not inbound.get("enable", True):
+                continue
+            for client in inbound["clients"]:
+                if client["subId"] == key and client.get("enable", True):
+                    links.extend(self._links(inbound, client))
+        return links
+
+    def inbound_models(self) -> List[Inbound]:
+        models = []
+        for inbound in self.inbounds:
+            clients = []
+            for index, client in enumerate(inbound["clients"]):
+                ident = XUIRequest.generate_client_identifier(inbound["id"], client["subId"])
+                clients.append({**client, "email": ident, "ident": ident, "index": index})
+            models.append(
+                Inbound(
+                    id=inbound["id"],
+                    remark=inbound["remark"],
+                    enable=inbound.get("enable", True),
+                    clientStats=[
+                        {
+                            "id": inbound["id"] * 100 + client["index"],
+                            "inboundId": inbound["id"],
+                            "email": client["email"],
+                            "enable": True,
+                            "expiryTime": 0,
+                            "up": 0,
+                            "down": client.get("down", 0),
+                            "total": 0,
+                            "allTime": 0,
+                            "reset": 0,
+                        }
+                        for client in clients
+                    ],
+                    settings=json.dumps(
+                        {
+                            "clients": [
+                                {"email": client["email"], "enable": client.get("enable", True), "subId": client["subId"]}
+                                for client in clients
+                            ]
+                        }
+                    ),
+                )
+            )
+        return models
+
+
+def _client(key: str, enable: bool = True, down: int = 0) -> dict:
+    return {"subId": key, "enable": enable, "down": down}
+
+
+KEYS = {name: f"{name}{name}{name}{name}0000-1111-2222-3333-444455556666" for name in "abcdef"}
+
+
+@pytest.fixture(autouse=True)
+def panel(monkeypatch):
+    state: Dict[str, Optional[FakePanel]] = {"panel": None}
+
+    async def get_links(host: str) -> Optional[List[str]]:
+        return state["panel"].sub(host.rsplit("/", 1)[1])
+
+    monkeypatch.setattr(XUIRequest, "get_links", get_links)
+    LinkTemplateStore._templates.clear()
+    yield state
+    LinkTemplateStore._templates.clear()
+
+
+def test_render_matches_panel_output_for_heterogeneous_inbounds(panel):
+    a, b, c, d, e = (KEYS[name] for name in "abcde")
+    fake = FakePanel(
+        [
+            {"id": 1, "remark": "reality", "protocol": "vless", "port": 443, "clients": [_client(a), _client(b), _client(c)]},
+            {
+                "id": 2,
+                "remark": "cdn",
+                "protocol": "vmess",
+                "port": 8080,
+                "hosts": ["cdn1.example", "cdn2.example"],
+                "clients": [_client(a), _client(b), _client(e, enable=False)],
+            },
+            {
+                "id": 3,
+                "remark": "trojan",
+                "protocol": "trojan",
+                "port": 2083,
+                "clients": [_client(b), _client(c, enable=False)],
+            },
+            {"id": 4, "remark": "off", "protocol": "vless", "port": 8443, "enable": False, "clients": [_client(a), _client(d)]},
+            {
+                "id": 12,
+                "remark": "ss",
+                "protocol": "shadowsocks",
+                "port": 9000,
+                "clients": [_client(a), _client(c), _client(d)],
+            },
+            {"id": 13, "remark": "solo", "protocol": "trojan", "port": 2087, "clients": [_client(d)]},
+        ]
+    )
+    panel["panel"] = fake
+
+    assert asyncio.run(LinkTemplateStore.build(SERVER, fake.inbound_models()))
+    for key in (a, b, c, d, e):
+        assert LinkTemplateStore.render(SERVER.id, key) == fake.sub(key), key
+    assert LinkTemplateStore.render(SERVER.id, e) == []
+    assert LinkTemplateStore.render(SERVER.id, KEYS["f"]) is None
+
+
+def test_per_client_remarks_fall_back_to_snapshots(panel):
+    a, b = KEYS["a"], KEYS["b"]
+    fake = FakePanel(
+        [
+            {"id": 1, "remark": "reality", "protocol": "vless", "port": 443, "clients": [_client(a), _client(b)]},
+            {
+                "id": 2,
+                "remark": "usage",
+                "protocol": "trojan",
+                "port": 2083,
+                "show_usage": True,
+                "clients": [_client(a, down=5 * 1024**2), _client(b, down=7 * 1024**2)],
+            },
+        ]
+    )
+    panel["panel"] = fake
+
+    assert not asyncio.run(LinkTemplateStore.build(SERVER, fake.inbound_models()))
+    assert LinkTemplateStore.render(SERVER.id, a) is None
+
+
+def test_unmatched_link_refuses_templates(panel):
+    a = KEYS["a"]
+    fake = FakePanel([{"id": 1, "remark": "reality", "protocol": "vless", "port": 443, "clients": [_client(a)]}])
+    panel["panel"] = SimpleNamespace(sub=lambda key: fake.sub(key) + ["vless://someone-else@node.example:1#x"])
+
+    assert not asyncio.run(LinkTemplateStore.build(SERVER, fake.inbound_models()))